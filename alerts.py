@@ -0,0 +1,171 @@
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass, field
+
+from instrumentation import timed
+
+ALERT_TEXT = "Alert! Fraudulent transaction detected!"
+
+
+@dataclass
+class Alert:
+    transaction: dict = None
+    prob_fraud: float = None
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class AlertBurst:
+    """Alerts coalesced into one delivery; ``count`` includes alerts not kept in ``alerts``."""
+    alerts: list
+    count: int
+
+
+def ensure_voice_alert(path="alert.mp3", text=ALERT_TEXT):
+    """Render the spoken alert to ``path`` once with gTTS, unless it already exists."""
+    if not os.path.exists(path):
+        from gtts import gTTS
+
+        gTTS(text, lang="en").save(path)
+    return path
+
+
+class AudioSink:
+    """Plays a pre-rendered alert sound (alarm.wav / alert.mp3) without blocking the caller.
+
+    Without pygame or an audio device the sink is disabled (``error`` says
+    why, ``skipped`` counts the bursts it did not play), so the other sinks
+    still deliver.
+    """
+
+    def __init__(self, sound_path):
+        self.sound_path = sound_path
+        self.error = None
+        self.skipped = 0
+        self._music = None
+        try:
+            import pygame  # ✅ Only needed when audio alerts are enabled
+
+            if os.path.exists(sound_path):
+                pygame.mixer.init()
+                pygame.mixer.music.load(sound_path)  # ✅ Decoded once, replayed for every burst
+                self._music = pygame.mixer.music
+        except Exception as e:  # ✅ ImportError, or pygame.error when the host has no audio device
+            self.error = f"{type(e).__name__}: {e}"
+
+    def send(self, burst):
+        if self.error is not None:
+            self.skipped += 1
+        elif self._music is not None and not self._music.get_busy():
+            self._music.play()
+
+
+class LogFileSink:
+    """Appends one JSON line per burst to a log file."""
+
+    def __init__(self, path="fraud_alerts.log"):
+        self.path = path
+
+    def send(self, burst):
+        entry = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "count": burst.count,
+            "alerts": [{"transaction": a.transaction, "prob_fraud": a.prob_fraud} for a in burst.alerts],
+        }
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, default=str) + "\n")
+
+
+class WebhookSink:
+    """POSTs a burst summary as JSON; without a URL it only keeps the last payload (stub)."""
+
+    def __init__(self, url=None, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+        self.last_payload = None
+
+    def send(self, burst):
+        self.last_payload = {"text": ALERT_TEXT, "count": burst.count,
+                             "max_prob_fraud": max(((a.prob_fraud or 0.0) for a in burst.alerts), default=0.0)}
+        if self.url:
+            request = urllib.request.Request(self.url, data=json.dumps(self.last_payload).encode(),
+                                             headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+class AlertDispatcher:
+    """Delivers fraud alerts to sinks from a background worker thread.
+
+    ``submit`` never blocks: alerts go into a bounded queue and are dropped
+    (and counted) when it is full. The worker waits ``coalesce_window`` seconds
+    after the first alert of a burst, merges everything that arrived, and
+    delivers at most one burst every ``min_interval`` seconds.
+    """
+
+    def __init__(self, sinks, max_queue=1000, min_interval=5.0, coalesce_window=0.5, max_burst_alerts=100):
+        self.sinks = list(sinks)
+        self.max_burst_alerts = max_burst_alerts
+        self.min_interval = min_interval
+        self.coalesce_window = coalesce_window
+        self.submitted = 0
+        self.dropped = 0
+        self.delivered_bursts = 0
+        self.sink_errors = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, transaction=None, prob_fraud=None):
+        """Queue an alert; returns False if it was dropped because the queue is full."""
+        try:
+            with timed("alerts.submit"):
+                self._queue.put_nowait(Alert(transaction, prob_fraud))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def close(self, timeout=5.0):
+        """Deliver whatever is pending and stop the worker."""
+        self._stop.set()
+        self._worker.join(timeout)
+
+    def _run(self):
+        pending = []
+        pending_count = 0
+        pending_since = next_allowed = 0.0
+        while True:
+            now = time.monotonic()
+            deliver_at = max(pending_since + self.coalesce_window, next_allowed)
+            if pending_count and (self._stop.is_set() or now >= deliver_at):
+                self._deliver(AlertBurst(pending, pending_count))
+                pending, pending_count = [], 0
+                next_allowed = now + self.min_interval
+                continue
+            if self._stop.is_set() and self._queue.empty():
+                return
+
+            try:
+                alert = self._queue.get(timeout=max(deliver_at - now, 0.0) if pending_count else 0.1)
+            except queue.Empty:
+                continue
+            if not pending_count:
+                pending_since = time.monotonic()
+            pending_count += 1
+            if len(pending) < self.max_burst_alerts:  # ✅ Keep memory bounded while rate limited
+                pending.append(alert)
+
+    def _deliver(self, burst):
+        self.delivered_bursts += 1
+        for sink in self.sinks:
+            try:
+                with timed(f"alerts.{type(sink).__name__}", rows=burst.count):
+                    sink.send(burst)
+            except Exception:
+                self.sink_errors += 1  # ✅ A broken sink must not stop the other sinks or the worker
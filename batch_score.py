@@ -0,0 +1,191 @@
+"""Stream a CSV or Parquet file of transactions through the model in fixed-size chunks.
+
+    python batch_score.py fraud.csv scored.csv --chunk-rows 250000 --workers 4
+
+Chunks are decided in a process pool by the same DecisionEngine as the monitor
+and the scoring service (rule pre-filter, per-type block thresholds from
+thresholds.json) and written to the output (CSV or Parquet) in input order as
+soon as they are done, so memory stays flat whatever the input size. Prints
+rows/sec and peak RSS when finished, and the drift signal against the model's
+reference profile (drift.py) when it has one.
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from decision import get_decision_engine
+from drift import format_report, get_drift_monitor
+from feature_store import VelocityFeatureStore
+from ingest import RejectLog, validate_frame
+from model_registry import DEFAULT_MODEL_PATH, load_model
+
+_worker_model_path = None
+
+
+def _init_worker(model_path):
+    global _worker_model_path
+    _worker_model_path = model_path
+    load_model(model_path)  # ✅ Load once per worker, not once per chunk
+
+
+def _decide(loaded, chunk):
+    decisions = get_decision_engine().decide(loaded.model, loaded.encoder, chunk)
+    return decisions.prob_fraud, decisions.labels, decisions.block, decisions.type_codes
+
+
+def _score_chunk(chunk):
+    return _decide(load_model(_worker_model_path), chunk)
+
+
+def read_chunks(path, chunk_rows):
+    """Yield DataFrames of at most ``chunk_rows`` rows from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._wrote_header = False
+
+    def write(self, chunk):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its largest worker, in MB."""
+    to_mb = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)  # ru_maxrss is KB on Linux, bytes on macOS
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * to_mb
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * to_mb
+    return own, workers
+
+
+def _finish(chunk, result):
+    prob_fraud, labels, block, _ = result
+    return chunk.assign(prob_fraud=prob_fraud, is_fraud_pred=labels, block=block)
+
+
+def score_file(input_path, output_path, model_path=DEFAULT_MODEL_PATH, chunk_rows=250_000, workers=None,
+               on_chunk=None, velocity_store=None, reject_log=None, drift=None):
+    """Score ``input_path`` into ``output_path``; returns the number of rows scored.
+
+    With a VelocityFeatureStore, per-account velocity columns are added too.
+    They depend on row order, so they are computed here as chunks are written.
+    Malformed rows are left out of the output and go to ``reject_log``.
+    Scored chunks are added to ``drift`` (a DriftMonitor) when given.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    writer = ChunkWriter(output_path)
+    rows = 0
+
+    def write(chunk, result):
+        nonlocal rows
+        if drift is not None:
+            drift.update(chunk, result[0], result[3])
+        if velocity_store is not None:
+            chunk = chunk.join(velocity_store.update_frame(chunk))
+        writer.write(_finish(chunk, result))
+        rows += len(chunk)
+        if on_chunk is not None:
+            on_chunk(rows)
+
+    loaded = load_model(model_path)
+    # ✅ Only ship the columns the encoder reads (type, amounts, step if present) to the workers
+    model_columns = ["type"] + [name for name, _ in loaded.encoder.numeric_slots]
+
+    def checked_chunks():
+        for chunk in read_chunks(input_path, chunk_rows):
+            checked = validate_frame(chunk)
+            if checked.missing_columns:
+                raise ValueError(f"missing required columns: {', '.join(checked.missing_columns)}")
+            if reject_log is not None:
+                reject_log.write(checked.rejects, input_path)
+            if len(checked.data):
+                yield checked.data
+
+    try:
+        if workers <= 1:
+            for chunk in checked_chunks():
+                write(chunk, _decide(loaded, chunk))
+            return rows
+
+        # ✅ At most two chunks per worker in flight keeps memory bounded
+        in_flight = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            for chunk in checked_chunks():
+                in_flight.append((chunk, pool.submit(_score_chunk, chunk[[c for c in model_columns if c in chunk.columns]])))
+                if len(in_flight) >= 2 * workers:
+                    done_chunk, future = in_flight.popleft()
+                    write(done_chunk, future.result())
+            while in_flight:
+                done_chunk, future = in_flight.popleft()
+                write(done_chunk, future.result())
+        return rows
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or .parquet file with the six required columns")
+    parser.add_argument("output", help="CSV or .parquet file to write; input columns + prob_fraud, is_fraud_pred, block")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="1 scores in this process")
+    parser.add_argument("--velocity", action="store_true", help="add per-account velocity features (needs nameOrig, nameDest)")
+    parser.add_argument("--max-accounts", type=int, default=1_000_000, help="velocity store size per account side")
+    parser.add_argument("--rejects", help="CSV report of malformed rows (default: <output>.rejects.csv)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(rows):
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows:>12,} rows  {rows / elapsed:>10,.0f} rows/s", end="", file=sys.stderr)
+
+    velocity_store = VelocityFeatureStore(max_accounts=args.max_accounts) if args.velocity else None
+    reject_log = RejectLog(args.rejects or os.path.splitext(args.output)[0] + ".rejects.csv")
+    drift = get_drift_monitor(args.model)
+    rows = score_file(args.input, args.output, args.model, args.chunk_rows, args.workers, on_chunk=progress,
+                      velocity_store=velocity_store, reject_log=reject_log, drift=drift)
+    elapsed = time.perf_counter() - start
+    own_mb, worker_mb = peak_rss_mb()
+    print(file=sys.stderr)
+    print(f"✅ Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    if reject_log.rejected:
+        print(f"⚠ {reject_log.rejected:,} malformed rows skipped, see {reject_log.path}")
+    print(f"   peak RSS: {own_mb:,.0f} MB main process, {worker_mb:,.0f} MB largest worker")
+    if drift is not None:
+        print(format_report(drift.report()))
+
+
+if __name__ == "__main__":
+    main()
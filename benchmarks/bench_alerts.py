@@ -0,0 +1,43 @@
+"""Cost of raising an alert from the scoring loop, with a deliberately slow sink.
+
+Run from the project folder:  python -m benchmarks.bench_alerts --alerts 100000
+"""
+import argparse
+import time
+
+from alerts import AlertDispatcher
+
+
+class SlowSink:
+    """Stands in for speech synthesis: every delivery takes ``delay`` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.bursts = 0
+
+    def send(self, burst):
+        self.bursts += 1
+        time.sleep(self.delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--sink-delay", type=float, default=1.0, help="seconds per delivery")
+    args = parser.parse_args()
+
+    sink = SlowSink(args.sink_delay)
+    dispatcher = AlertDispatcher([sink], min_interval=0.5)
+
+    start = time.perf_counter()
+    for i in range(args.alerts):
+        dispatcher.submit({"row": i}, 0.99)
+    elapsed = time.perf_counter() - start
+    dispatcher.close()
+
+    print(f"submit cost : {elapsed / args.alerts * 1e6:.2f} us/alert (blocking sink would cost {args.sink_delay * 1e3:.0f} ms)")
+    print(f"queued      : {dispatcher.submitted:,}   dropped: {dispatcher.dropped:,}   bursts delivered: {sink.bursts}")
+
+
+if __name__ == "__main__":
+    main()
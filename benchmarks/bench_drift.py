@@ -0,0 +1,66 @@
+"""Cost of the drift histograms next to the scoring they follow, at several batch sizes.
+
+Run from the project folder:  python -m benchmarks.bench_drift --sizes 1 64 1000 10000 100000
+
+The reference profile is built from one synthetic sample, and the monitor is
+fed another sample with inflated amounts, so the report at the end shows a
+drift signal.
+"""
+import argparse
+import time
+
+from decision import get_decision_engine
+from drift import DriftMonitor, build_profile, format_report
+from model_registry import load_model
+
+from .synthetic import make_transactions
+
+
+def per_row_us(fn, batches):
+    start = time.perf_counter()
+    for batch in batches:
+        fn(batch)
+    return (time.perf_counter() - start) / sum(len(batch) for batch in batches) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 1_000, 10_000, 100_000])
+    parser.add_argument("--rows", type=int, default=200_000, help="rows pushed through per batch size")
+    args = parser.parse_args()
+
+    loaded = load_model()
+    engine = get_decision_engine()
+    reference = make_transactions(args.rows)
+    profile = build_profile(reference, engine.decide(loaded.model, loaded.encoder, reference).prob_fraud)
+
+    live = make_transactions(args.rows)
+    live["amount"] *= 1.5  # ✅ Amounts drift upwards
+    decisions = engine.decide(loaded.model, loaded.encoder, live)
+    prob_fraud, type_codes = decisions.prob_fraud, decisions.type_codes
+    records = live.to_dict("records")
+
+    print(f"{'batch':>8}  {'decide us/row':>14}  {'drift frame us/row':>19}  {'drift records us/row':>21}  {'overhead':>9}")
+    for size in args.sizes:
+        n = min(args.rows, max(size, 1_000 * size if size < 100 else args.rows))
+        batches = [live.iloc[i:i + size] for i in range(0, n, size)]
+        record_batches = [(records[i:i + size], prob_fraud[i:i + size], type_codes[i:i + size])
+                          for i in range(0, n, size)]
+        monitor = DriftMonitor(profile)
+
+        decide_us = per_row_us(lambda batch: engine.decide(loaded.model, loaded.encoder, batch), batches)
+        # ✅ Type codes come from the decision engine, as in the monitor engine and the scoring service
+        frame_us = per_row_us(lambda batch: monitor.update(batch, prob_fraud[batch.index[0]:batch.index[-1] + 1],
+                                                           type_codes[batch.index[0]:batch.index[-1] + 1]), batches)
+        start = time.perf_counter()
+        for batch, prob, codes in record_batches:
+            monitor.update_records(batch, prob, codes)
+        records_us = (time.perf_counter() - start) / n * 1e6
+        print(f"{size:>8,}  {decide_us:>14.2f}  {frame_us:>19.3f}  {records_us:>21.3f}  {frame_us / decide_us:>8.1%}")
+
+    print()
+    print(format_report(monitor.report()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-call cost of building a model input row: get_dummies path vs FeatureEncoder.
+
+Run from the project folder:  python -m benchmarks.bench_encoder --calls 5000
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_transactions
+from features import FeatureEncoder
+
+
+def encode_with_get_dummies(transaction, feature_names):
+    """The row encoding the "Predict Fraud" button used to do."""
+    user_input = pd.DataFrame([transaction])
+    user_input = pd.get_dummies(user_input)
+    for col in feature_names:
+        if col not in user_input.columns:
+            user_input[col] = 0
+    return user_input[feature_names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="lightgbm_model.pkl")
+    parser.add_argument("--calls", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file:
+        model, feature_names = pickle.load(file)
+
+    encoder = FeatureEncoder(feature_names)
+    records = make_transactions(args.calls).to_dict("records")
+
+    # ✅ Both paths must give identical feature values
+    for transaction in records[:1000]:
+        expected = encode_with_get_dummies(transaction, feature_names).to_numpy(dtype=np.float64)
+        assert np.array_equal(expected, encoder.encode_one(transaction)), transaction
+
+    start = time.perf_counter()
+    for transaction in records:
+        encode_with_get_dummies(transaction, feature_names)
+    old_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for transaction in records:
+        encoder.encode_one(transaction)
+    new_secs = time.perf_counter() - start
+
+    frame = pd.DataFrame(records)
+    start = time.perf_counter()
+    encoder.encode_frame(frame)
+    frame_secs = time.perf_counter() - start
+
+    print(f"get_dummies + padding : {old_secs / len(records) * 1e6:>10.1f} us/call")
+    print(f"encoder.encode_one    : {new_secs / len(records) * 1e6:>10.1f} us/call")
+    print(f"encoder.encode_frame  : {frame_secs / len(records) * 1e6:>10.3f} us/row")
+    print(f"per-call saving       : {(old_secs - new_secs) / len(records) * 1e6:>10.1f} us ({old_secs / new_secs:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
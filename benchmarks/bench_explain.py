@@ -0,0 +1,63 @@
+"""Time per explanation: per-row LimeTabularExplainer vs cached explainers.
+
+Run from the project folder:  python -m benchmarks.bench_explain --rows 50
+(--lime needs reference_sample.npz, see explain.build_reference_sample)
+"""
+import argparse
+import pickle
+import time
+
+from lime.lime_tabular import LimeTabularExplainer
+
+from benchmarks.synthetic import make_transactions
+from explain import FraudExplainer
+from features import FeatureEncoder
+
+
+def explain_like_before(model, feature_names, row):
+    """What the Predict Fraud button used to do for each flagged transaction."""
+    explainer = LimeTabularExplainer(training_data=row, feature_names=feature_names,
+                                     class_names=["Legitimate", "Fraud"], mode="classification")
+    return explainer.explain_instance(row[0], model.predict_proba, num_features=5).as_list()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="lightgbm_model.pkl")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    parser.add_argument("--lime", action="store_true", help="also time the cached LIME explainer")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file:
+        model, feature_names = pickle.load(file)
+    encoder = FeatureEncoder(feature_names)
+    matrix = encoder.encode_frame(make_transactions(max(args.rows, args.batch_rows)))
+
+    start = time.perf_counter()
+    for i in range(args.rows):
+        explain_like_before(model, feature_names, matrix[i:i + 1])
+    old_secs = (time.perf_counter() - start) / args.rows
+    print(f"LIME, new explainer per row : {old_secs * 1e3:10.2f} ms/explanation")
+
+    if args.lime:
+        lime = FraudExplainer(model, encoder, method="lime")
+        start = time.perf_counter()
+        lime.explain(matrix[:args.rows])
+        print(f"LIME, cached explainer      : {(time.perf_counter() - start) / args.rows * 1e3:10.2f} ms/explanation")
+
+    contrib = FraudExplainer(model, encoder)
+    start = time.perf_counter()
+    for i in range(args.rows):
+        contrib.explain(matrix[i:i + 1])
+    row_secs = (time.perf_counter() - start) / args.rows
+    print(f"pred_contrib, one row       : {row_secs * 1e3:10.3f} ms/explanation ({old_secs / row_secs:,.0f}x)")
+
+    start = time.perf_counter()
+    contrib.explain(matrix[:args.batch_rows])
+    batch_secs = (time.perf_counter() - start) / args.batch_rows
+    print(f"pred_contrib, batch         : {batch_secs * 1e3:10.4f} ms/explanation ({old_secs / batch_secs:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
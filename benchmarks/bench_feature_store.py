@@ -0,0 +1,51 @@
+"""Throughput and memory of VelocityFeatureStore with many distinct accounts.
+
+Run from the project folder:  python -m benchmarks.bench_feature_store --accounts 10000000
+"""
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from feature_store import VelocityFeatureStore
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10_000_000, help="distinct origin accounts")
+    parser.add_argument("--transactions", type=int, default=20_000_000)
+    parser.add_argument("--max-accounts", type=int, default=1_000_000, help="store bound per side")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    store = VelocityFeatureStore(max_accounts=args.max_accounts)
+    # ✅ Account ids are built lazily per block so the id arrays do not dominate memory
+    block = 1_000_000
+    base_rss = rss_mb()
+
+    start = time.perf_counter()
+    done = 0
+    while done < args.transactions:
+        n = min(block, args.transactions - done)
+        origins = rng.integers(0, args.accounts, n)
+        dests = rng.integers(0, args.accounts // 10 or 1, n)  # fewer destinations: mule accounts repeat
+        amounts = rng.lognormal(11.0, 1.5, n)
+        steps = (done + np.arange(n)) // 10_000  # ~10k transactions per hour
+        for orig, dest, step, amount in zip(origins.tolist(), dests.tolist(), steps.tolist(), amounts.tolist()):
+            store.update(f"C{orig}", f"M{dest}", step, amount)
+        done += n
+        elapsed = time.perf_counter() - start
+        print(f"{done:>12,} tx  {done / elapsed:>10,.0f} tx/s  accounts kept {len(store):>10,}  "
+              f"evicted {store.evicted:>10,}  peak RSS {rss_mb():,.0f} MB")
+
+    kept = max(len(store), 1)
+    print(f"≈ {(rss_mb() - base_rss) * 1024 * 1024 / kept:,.0f} bytes per kept account (incl. key strings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Spreadsheet ingestion: pd.read_excel against the streaming reader and converted files.
+
+Run from the project folder:  python -m benchmarks.bench_ingest --sizes 10000 100000 1000000
+
+Each sheet has the columns of fraud.csv (so five the model does not need)
+and a few malformed rows. Writing the 1M-row sheet itself takes a few minutes.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import REQUIRED_COLUMNS
+from ingest import convert, read_excel_columns, read_table, validate_frame
+
+from .synthetic import make_transactions
+
+
+def write_sheet(path, n):
+    import openpyxl
+
+    data = make_transactions(n)
+    rng = np.random.default_rng(1)
+    data.insert(0, "step", rng.integers(1, 744, n))
+    data.insert(3, "nameOrig", np.char.add("C", rng.integers(0, 10**9, n).astype(str)))
+    data.insert(6, "nameDest", np.char.add("M", rng.integers(0, 10**9, n).astype(str)))
+    data["isFraud"] = 0
+    data["isFlaggedFraud"] = 0
+    data = data.astype(object)
+    data.iloc[1::10_000, data.columns.get_loc("amount")] = "n/a"  # ✅ Malformed rows for the reject path
+    data.iloc[2::10_000, data.columns.get_loc("type")] = "WIRE"
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(data.columns))
+    for row in data.itertuples(index=False):
+        sheet.append(list(row))
+    workbook.save(path)
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{n:>10,}  {label:<30} {elapsed:>8.2f} s  {n / elapsed:>12,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        print(f"{'rows':>10}  {'path':<30} {'time':>10}  {'throughput':>17}")
+        for n in args.sizes:
+            sheet = os.path.join(folder, f"tx-{n}.xlsx")
+            write_sheet(sheet, n)
+
+            timed("pd.read_excel (current)", n, lambda: pd.read_excel(sheet)[REQUIRED_COLUMNS])
+            result = timed("streaming reader + validation", n, lambda: validate_frame(read_excel_columns(sheet)[0]))
+            timed("tail poll (last 10 rows)", n, lambda: read_excel_columns(sheet, skip_rows=n - 10))
+            timed("convert to .parquet", n, lambda: convert(sheet, os.path.join(folder, "tx.parquet")))
+            timed("convert to .csv", n, lambda: convert(sheet, os.path.join(folder, "tx.csv")))
+            timed("read .parquet + validation", n, lambda: read_table(os.path.join(folder, "tx.parquet")))
+            timed("read .csv + validation", n, lambda: read_table(os.path.join(folder, "tx.csv")))
+            print(f"{'':>10}  {len(result.data):,} valid rows, {len(result.rejects):,} rejected\n")
+            os.remove(sheet)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""End-to-end detection latency and CPU use of MonitorEngine as CSV sources are added.
+
+Run from the project folder:  python -m benchmarks.bench_monitor --sources 1 2 4 8 16 --rate 200
+
+A writer thread appends rows to every source file at ``--rate`` rows/s each,
+stamping each row with the time it was written; latency is measured when the
+scored row reaches a subscriber.
+"""
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from model_registry import get_registry
+from monitor import MonitorEngine, TailSource
+from sources import open_tail
+
+from .synthetic import make_transactions
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def write_rows(paths, rate, duration, stop):
+    """Append ``rate`` rows per second to every file in ``paths`` in 10 ms ticks."""
+    rows = make_transactions(100_000)
+    lines = rows.to_csv(header=False, index=False).splitlines()
+    tick = 0.01
+    per_tick = rate * tick
+    due, written = 0.0, 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline and not stop.is_set():
+        due += per_tick
+        n = int(due) - written
+        if n:
+            now = time.time()
+            for path in paths:
+                with open(path, "a") as file:
+                    for i in range(written, written + n):
+                        file.write(f"{lines[i % len(lines)]},{now}\n")
+            written += n
+        time.sleep(tick)
+
+
+def run(n_sources, rate, duration, poll_interval, max_wait_ms):
+    folder = tempfile.mkdtemp(prefix="bench_monitor_")
+    paths = [os.path.join(folder, f"source-{i}.csv") for i in range(n_sources)]
+    header = ",".join(list(make_transactions(1).columns) + ["sent_at"]) + "\n"
+    for path in paths:
+        with open(path, "w") as file:
+            file.write(header)
+
+    engine = MonitorEngine(get_registry(), max_wait_ms=max_wait_ms).start()
+    subscription = engine.subscribe(max_batches=100_000)
+    for path in paths:
+        engine.add_source(TailSource(open_tail(path), path, poll_interval))
+
+    stop = threading.Event()
+    writer = threading.Thread(target=write_rows, args=(paths, rate, duration, stop))
+    cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+    writer.start()
+
+    latencies = []
+    while writer.is_alive() or time.perf_counter() - wall_start < duration + 2 * poll_interval:
+        for batch in subscription.get(timeout=0.1):
+            if batch.error is None:
+                latencies.append(time.time() - batch.data["sent_at"].to_numpy())
+    stop.set()
+    writer.join()
+    cpu = cpu_seconds() - cpu_start
+    wall = time.perf_counter() - wall_start
+    engine.stop()
+    shutil.rmtree(folder, ignore_errors=True)
+
+    latencies = np.concatenate(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{n_sources:>7}  {len(latencies):>8,}  {p50:>8.1f}  {p95:>8.1f}  {p99:>8.1f}  "
+          f"{100 * cpu / wall:>6.1f}%  {engine.stats['batches']:>7,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rate", type=int, default=200, help="rows per second written to each source")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of writing per configuration")
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    parser.add_argument("--max-wait-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print(f"rate {args.rate} rows/s per source, poll every {args.poll_interval} s, max wait {args.max_wait_ms} ms")
+    print(f"{'sources':>7}  {'rows':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'CPU':>7}  {'batches':>7}")
+    for n_sources in args.sources:
+        run(n_sources, args.rate, args.duration, args.poll_interval, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
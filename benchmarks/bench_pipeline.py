@@ -0,0 +1,135 @@
+"""Per-stage timings of the scoring pipeline at batch sizes from 1 to 1M rows.
+
+Run from the project folder:  python -m benchmarks.bench_pipeline --sizes 1 10 100 1000 10000 100000 1000000
+
+Synthetic transactions (all five types, balances consistent with the amount)
+are pushed through every stage the apps run. The stages are the legacy
+per-row path, encoding, prediction, explanations, alert submission, the
+velocity store and the transaction store. Timings come from the
+instrumentation layer, the same counters the running app exposes with
+FRAUD_INSTRUMENT=1.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from alerts import AlertDispatcher
+from explain import FraudExplainer
+from feature_store import VelocityFeatureStore
+from model_registry import load_model
+from scoring import labels_from_proba, score_batch
+from txn_store import TransactionStore
+
+from .synthetic import make_transactions
+
+
+class NullSink:
+    def send(self, burst):
+        pass
+
+
+def legacy_per_row(model, feature_names, data):
+    """The per-row path demo.py/ex.py used to run, with every step recorded separately."""
+    record = instrumentation.record
+    for latest_data in data.to_dict("records"):
+        start = time.perf_counter()
+        user_input = pd.DataFrame([latest_data])
+        t1 = time.perf_counter()
+        user_input = pd.get_dummies(user_input)
+        t2 = time.perf_counter()
+        for col in feature_names:
+            if col not in user_input.columns:
+                user_input[col] = 0
+        user_input = user_input[feature_names]
+        t3 = time.perf_counter()
+        model.predict(user_input)
+        t4 = time.perf_counter()
+        model.predict_proba(user_input)
+        t5 = time.perf_counter()
+        record("legacy.dataframe", t1 - start)
+        record("legacy.get_dummies", t2 - t1)
+        record("legacy.pad_columns", t3 - t2)
+        record("legacy.predict", t4 - t3)
+        record("legacy.predict_proba", t5 - t4)
+
+
+def run_size(loaded, data, accounts, args, store_root):
+    """Push ``data`` through every stage ``repeat`` times; returns the instrumentation snapshot."""
+    instrumentation.reset()
+    model, encoder = loaded.model, loaded.encoder
+    n = len(data)
+    repeat = max(1, min(args.max_repeat, args.target_rows // n))
+    explainer = FraudExplainer(model, encoder, method="contrib")
+    dispatcher = AlertDispatcher([NullSink()], max_queue=args.explain_max, min_interval=0.0)
+    velocity = VelocityFeatureStore()
+    store = TransactionStore(store_root)
+
+    if n <= args.legacy_max:
+        legacy_per_row(model, loaded.feature_names, data)
+
+    for _ in range(repeat):
+        prob_fraud, _ = score_batch(model, encoder, data)
+        with instrumentation.timed("score.labels", rows=n):
+            labels_from_proba(model, prob_fraud)
+
+        flagged = prob_fraud > 0.5
+        flagged[np.flatnonzero(flagged)[args.explain_max:]] = False
+        explainer.explain_flagged(encoder, data, flagged)
+        for transaction in data[flagged].to_dict("records"):
+            dispatcher.submit(transaction)
+
+        if n <= args.velocity_max:
+            velocity.update_frame(accounts, default_step=0)
+        store.append(data, prob_fraud, loaded.version)
+
+    dispatcher.close()
+    return instrumentation.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--target-rows", type=int, default=100_000, help="small batches repeat up to this many rows")
+    parser.add_argument("--max-repeat", type=int, default=1_000)
+    parser.add_argument("--legacy-max", type=int, default=1_000, help="largest batch run through the per-row path")
+    parser.add_argument("--explain-max", type=int, default=10_000, help="flagged rows explained/alerted per batch")
+    parser.add_argument("--velocity-max", type=int, default=100_000, help="largest batch run through the velocity store")
+    parser.add_argument("--json", help="also write every snapshot (with histograms) to this file")
+    args = parser.parse_args()
+
+    instrumentation.enable()
+    loaded = load_model()
+    full = make_transactions(max(args.sizes))
+    rng = np.random.default_rng(0)
+    full["nameOrig"] = np.char.add("C", rng.integers(0, 1_000_000, len(full)).astype(str))
+    full["nameDest"] = np.char.add("M", rng.integers(0, 100_000, len(full)).astype(str))
+
+    results = {}
+    print(f"{'rows':>9}  {'stage':<24} {'calls':>7}  {'mean ms':>10}  {'p99 ms':>8}  {'us/row':>9}  {'rows/s':>13}")
+    for size in args.sizes:
+        data = full.head(size)
+        store_root = tempfile.mkdtemp(prefix="bench_pipeline_")
+        try:
+            results[size] = run_size(loaded, data, data, args, store_root)
+        finally:
+            shutil.rmtree(store_root, ignore_errors=True)
+        for stage, stats in results[size].items():
+            per_row_us = stats["total_ms"] * 1000 / stats["rows"] if stats["rows"] else 0.0
+            rows_per_s = stats["rows"] / (stats["total_ms"] / 1000) if stats["total_ms"] else float("inf")
+            print(f"{size:>9,}  {stage:<24} {stats['calls']:>7,}  {stats['mean_ms']:>10.4f}  "
+                  f"{stats['p99_ms']:>8}  {per_row_us:>9.3f}  {rows_per_s:>13,.0f}")
+        print()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare the old per-row monitoring path with batch scoring.
+
+Run from the project folder:  python -m benchmarks.bench_scoring --rows 100000
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_transactions
+from features import FeatureEncoder
+from scoring import score_batch
+
+
+def score_per_row(model, feature_names, data):
+    """The loop real_time_monitoring used to run for every transaction."""
+    probs = []
+    for _, latest_data in data.iterrows():
+        user_input = pd.DataFrame([latest_data])
+        user_input = pd.get_dummies(user_input)
+        for col in feature_names:
+            if col not in user_input.columns:
+                user_input[col] = 0
+        user_input = user_input[feature_names]
+        model.predict(user_input)
+        probs.append(model.predict_proba(user_input)[0][1])
+    return np.array(probs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="lightgbm_model.pkl")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-row-rows", type=int, default=2_000, help="rows to push through the slow path")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file:
+        model, feature_names = pickle.load(file)
+
+    data = make_transactions(args.rows)
+    sample = data.head(args.per_row_rows)
+
+    start = time.perf_counter()
+    old_probs = score_per_row(model, feature_names, sample)
+    per_row_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    probs, _ = score_batch(model, FeatureEncoder(feature_names), data)
+    batch_secs = time.perf_counter() - start
+
+    print(f"per-row : {len(sample) / per_row_secs:>12,.0f} rows/s  ({per_row_secs / len(sample) * 1e3:.3f} ms/row)")
+    print(f"batch   : {len(data) / batch_secs:>12,.0f} rows/s  ({batch_secs / len(data) * 1e6:.3f} us/row)")
+    print(f"speedup : {(per_row_secs / len(sample)) / (batch_secs / len(data)):,.0f}x")
+    print(f"max |prob diff| on shared rows: {np.abs(old_probs - probs[:len(sample)]).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
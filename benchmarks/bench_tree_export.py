@@ -0,0 +1,92 @@
+"""Cold start, memory and latency: pickled LGBMClassifier vs exported NumPy forests (float and binned).
+
+Run from the project folder (Linux):  python -m benchmarks.bench_tree_export
+(exports lightgbm_model.forest and lightgbm_model.binned.forest first if they do not exist)
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_transactions
+from features import FeatureEncoder
+from tree_export import export_forest, load_forest
+
+# ✅ Each cold start runs in a fresh interpreter so imports are not cached
+COLD_START = {
+    "pickle + lightgbm": "import pickle; model, names = pickle.load(open({path!r}, 'rb'))",
+    "numpy forest": "from tree_export import load_forest; forest = load_forest({path!r})",
+    "binned forest": "from tree_export import load_forest; forest = load_forest({path!r})",
+}
+# ✅ Current RSS from /proc: ru_maxrss would include the parent's image inherited through fork
+PROBE = """
+import json, os, time
+start = time.perf_counter()
+{load}
+seconds = time.perf_counter() - start
+rss_mb = int(open("/proc/self/statm").read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+print(json.dumps({{"seconds": seconds, "rss_mb": rss_mb}}))
+"""
+
+
+def cold_start(load):
+    output = subprocess.run([sys.executable, "-c", PROBE.format(load=load)], capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def per_call_ms(fn, rows, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(rows[i % len(rows)])
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="lightgbm_model.pkl")
+    parser.add_argument("--forest", default="lightgbm_model.forest")
+    parser.add_argument("--binned-forest", default="lightgbm_model.binned.forest")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows for the accuracy check")
+    parser.add_argument("--repeat", type=int, default=2_000, help="single-row calls to time")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file:
+        model, feature_names = pickle.load(file)
+    if not os.path.exists(args.forest):
+        export_forest(model, feature_names, args.forest)
+    if not os.path.exists(args.binned_forest):
+        export_forest(model, feature_names, args.binned_forest, binned=True)
+    forest = load_forest(args.forest)
+    binned = load_forest(args.binned_forest)
+    paths = {"pickle + lightgbm": args.model, "numpy forest": args.forest, "binned forest": args.binned_forest}
+
+    for name, load in COLD_START.items():
+        result = cold_start(load.format(path=paths[name]))
+        print(f"cold start {name:<18}: {result['seconds'] * 1e3:8.1f} ms, RSS {result['rss_mb']:6.1f} MB")
+
+    encoder = FeatureEncoder(feature_names)
+    matrix = encoder.encode_frame(make_transactions(args.rows))
+    expected = model.predict_proba(pd.DataFrame(matrix, columns=feature_names))[:, 1]
+    for name, compiled in [("numpy forest", forest), ("binned forest", binned)]:
+        start = time.perf_counter()
+        diff = np.abs(expected - compiled.predict_proba(matrix)[:, 1])
+        rows_per_s = args.rows / (time.perf_counter() - start)
+        print(f"{name:<14}: max |predict_proba diff| over {args.rows:,} rows {diff.max():.2e}, {rows_per_s:,.0f} rows/s")
+
+    rows = [matrix[i:i + 1] for i in range(100)]
+    frames = [pd.DataFrame(row, columns=feature_names) for row in rows]
+    print(f"single row, sklearn predict_proba : {per_call_ms(model.predict_proba, frames, args.repeat):.3f} ms")
+    print(f"single row, booster.predict       : {per_call_ms(model.booster_.predict, rows, args.repeat):.3f} ms")
+    print(f"single row, numpy forest          : {per_call_ms(forest.predict_proba, rows, args.repeat):.3f} ms")
+    print(f"single row, binned forest         : {per_call_ms(binned.predict_proba, rows, args.repeat):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Append, scan and rescore throughput of TransactionStore.
+
+Run from the project folder:  python -m benchmarks.bench_txn_store --rows 50000000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from model_registry import load_model
+from txn_store import TransactionStore
+
+from .synthetic import make_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--batch-rows", type=int, default=1_000_000)
+    parser.add_argument("--rescore-rows", type=int, default=5_000_000, help="rows rescored from the last time window")
+    parser.add_argument("--root", default=None, help="store folder (default: a temporary folder, removed afterwards)")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix="txn_store_")
+    try:
+        store = TransactionStore(root)
+        batch = make_transactions(args.batch_rows)
+        prob_fraud = np.random.default_rng(0).random(len(batch)).astype(np.float32)
+
+        # ✅ One synthetic batch is appended repeatedly, one second apart, to reach --rows
+        start = time.perf_counter()
+        appended = 0
+        while appended < args.rows:
+            n = min(args.batch_rows, args.rows - appended)
+            store.append(batch.iloc[:n], prob_fraud[:n], "bench", timestamp=1_000_000 + appended // args.batch_rows)
+            appended += n
+        elapsed = time.perf_counter() - start
+        print(f"append : {appended:,} rows in {elapsed:.1f} s ({appended / elapsed:,.0f} rows/s)")
+
+        start = time.perf_counter()
+        flagged = 0
+        for _, views in store.scan(columns=["prob_fraud"]):
+            flagged += int(np.count_nonzero(views["prob_fraud"] > 0.7))
+        elapsed = time.perf_counter() - start
+        print(f"scan   : {len(store):,} rows in {elapsed:.2f} s ({len(store) / elapsed:,.0f} rows/s), {flagged:,} > 0.7")
+
+        last = 1_000_000 + (len(store) - 1) // args.batch_rows
+        window_start = last - max(args.rescore_rows // args.batch_rows, 1) + 1
+        loaded = load_model()
+        start = time.perf_counter()
+        rescored = sum(len(prob) for _, prob in store.rescore(loaded.model, loaded.encoder, start_time=window_start))
+        elapsed = time.perf_counter() - start
+        print(f"rescore: {rescored:,} rows in {elapsed:.1f} s ({rescored / elapsed:,.0f} rows/s)")
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Local load generator for scoring_service.py.
+
+Starts the service in a subprocess (unless --url is given), fires requests from
+concurrent client threads and reports p50/p99 latency and requests per second.
+
+    python -m benchmarks.load_generator --clients 32 --requests 200 --rows 1
+"""
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmarks.synthetic import make_transactions
+
+
+def wait_for_health(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("scoring service did not become healthy")
+
+
+def run_client(host, port, payloads, latencies):
+    conn = http.client.HTTPConnection(host, port)
+    for body in payloads:
+        start = time.perf_counter()
+        conn.request("POST", "/score", body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="use an already running service instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--rows", type=int, default=1, help="transactions per request")
+    parser.add_argument("--max-batch-rows", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port
+    else:
+        host, port = "127.0.0.1", args.port
+        server = subprocess.Popen([sys.executable, "scoring_service.py", "--port", str(port),
+                                   "--max-batch-rows", str(args.max_batch_rows),
+                                   "--max-wait-ms", str(args.max_wait_ms)])
+    try:
+        wait_for_health(host, port)
+
+        records = make_transactions(args.requests * args.rows).to_dict("records")
+        payloads = [json.dumps(records[i * args.rows:(i + 1) * args.rows] if args.rows > 1 else records[i])
+                    for i in range(args.requests)]
+
+        latencies = []
+        threads = [threading.Thread(target=run_client, args=(host, port, payloads, latencies))
+                   for _ in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies_ms = np.array(latencies) * 1e3
+    print(f"requests : {len(latencies):,} from {args.clients} clients, {args.rows} row(s) each")
+    print(f"p50      : {np.percentile(latencies_ms, 50):.2f} ms")
+    print(f"p99      : {np.percentile(latencies_ms, 99):.2f} ms")
+    print(f"req/s    : {len(latencies) / elapsed:,.0f}")
+    print(f"rows/s   : {len(latencies) * args.rows / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
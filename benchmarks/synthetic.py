@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+# ✅ Share of each transaction type in fraud.csv
+TYPE_SHARES = {
+    "CASH_OUT": 0.3517,
+    "PAYMENT": 0.3381,
+    "CASH_IN": 0.2199,
+    "TRANSFER": 0.0838,
+    "DEBIT": 0.0065,
+}
+
+
+def make_transactions(n, seed=42):
+    """Generate ``n`` synthetic transactions with the six input columns."""
+    rng = np.random.default_rng(seed)
+    types = rng.choice(list(TYPE_SHARES), size=n, p=list(TYPE_SHARES.values()))
+
+    amount = np.round(rng.lognormal(mean=11.0, sigma=1.5, size=n), 2)
+    oldbalanceOrg = np.round(rng.lognormal(mean=10.0, sigma=2.5, size=n) * (rng.random(n) > 0.3), 2)
+    oldbalanceDest = np.round(rng.lognormal(mean=12.0, sigma=2.0, size=n) * (rng.random(n) > 0.4), 2)
+
+    # ✅ CASH_IN credits the origin account, every other type debits it
+    cash_in = types == "CASH_IN"
+    newbalanceOrig = np.where(cash_in, oldbalanceOrg + amount, np.maximum(oldbalanceOrg - amount, 0.0))
+    newbalanceDest = np.where(cash_in, np.maximum(oldbalanceDest - amount, 0.0), oldbalanceDest + amount)
+
+    return pd.DataFrame({
+        "type": types,
+        "amount": amount,
+        "oldbalanceOrg": oldbalanceOrg,
+        "newbalanceOrig": np.round(newbalanceOrig, 2),
+        "oldbalanceDest": oldbalanceDest,
+        "newbalanceDest": np.round(newbalanceDest, 2),
+    })
@@ -0,0 +1,117 @@
+"""Fraud decisions: a rule pre-filter, one booster call, per-type block thresholds.
+
+The thresholds and the types that skip the model come from thresholds.json:
+
+    {"default": 0.7, "types": {"TRANSFER": 0.7, "CASH_OUT": 0.7},
+     "skip_model_types": ["CASH_IN", "DEBIT", "PAYMENT"]}
+
+In fraud.csv only TRANSFER and CASH_OUT rows are ever fraudulent, so the
+other types are decided by the rule alone: probability 0, not blocked.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from features import TRANSACTION_TYPES
+from instrumentation import timed
+from scoring import DEFAULT_CHUNK_SIZE, labels_from_proba, predict_fraud_proba
+
+DEFAULT_THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+DEFAULT_THRESHOLD = 0.7  # ✅ The block threshold ex.py always used
+
+
+@dataclass
+class DecisionConfig:
+    default_threshold: float = DEFAULT_THRESHOLD
+    thresholds: dict = field(default_factory=dict)  # transaction type -> block threshold
+    skip_model_types: tuple = ("CASH_IN", "DEBIT", "PAYMENT")
+
+    @classmethod
+    def load(cls, path=DEFAULT_THRESHOLDS_PATH):
+        """Read thresholds.json; a missing file gives the defaults."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as file:
+            config = json.load(file)
+        unknown = set(config.get("types", {})) | set(config.get("skip_model_types", []))
+        unknown -= set(TRANSACTION_TYPES)
+        if unknown:
+            raise ValueError(f"unknown transaction types in {path}: {', '.join(sorted(unknown))}")
+        return cls(default_threshold=float(config.get("default", DEFAULT_THRESHOLD)),
+                   thresholds={t: float(v) for t, v in config.get("types", {}).items()},
+                   skip_model_types=tuple(config.get("skip_model_types", cls.skip_model_types)))
+
+
+@dataclass
+class Decisions:
+    prob_fraud: np.ndarray  # 0 for rows decided by the rule
+    labels: np.ndarray  # what ``model.predict`` would return (0.5 cut-off)
+    block: np.ndarray  # prob_fraud above the threshold for the row's type
+    scored: np.ndarray  # False where the rule skipped the model
+    type_codes: np.ndarray = None  # index into TRANSACTION_TYPES, -1 for unknown types
+
+
+class DecisionEngine:
+    """Turns transactions into decisions with at most one booster call per chunk.
+
+    Thresholds and the skip rule are looked up by type code, so unknown types
+    use the default threshold and always go to the model.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or DecisionConfig()
+        # ✅ Indexed by type code; the extra last entry serves code -1 (unknown type)
+        self._threshold_by_code = np.array([self.config.thresholds.get(t, self.config.default_threshold)
+                                            for t in TRANSACTION_TYPES] + [self.config.default_threshold])
+        self._skip_by_code = np.array([t in self.config.skip_model_types for t in TRANSACTION_TYPES] + [False])
+        self._code_by_type = {t: i for i, t in enumerate(TRANSACTION_TYPES)}
+
+    def decide(self, model, encoder, data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decide every row of a frame with the six REQUIRED_COLUMNS."""
+        type_codes = pd.Categorical(data["type"], categories=TRANSACTION_TYPES).codes
+        scored = ~self._skip_by_code[type_codes]
+        columns = {name: data[name].to_numpy(dtype=encoder.dtype)[scored]
+                   for name, _ in encoder.numeric_slots if name in data.columns}
+        with timed("decision.encode", rows=int(scored.sum())):
+            matrix = encoder.encode_columns(columns, type_codes[scored], n_rows=int(scored.sum()))
+        return self._finish(model, matrix, type_codes, scored, chunk_size)
+
+    def decide_records(self, model, encoder, records):
+        """Decide a list of transaction dicts (the scoring service's input)."""
+        type_codes = np.array([self._code_by_type.get(record.get("type"), -1) for record in records], dtype=np.int8)
+        scored = ~self._skip_by_code[type_codes]
+        with timed("decision.encode", rows=int(scored.sum())):
+            matrix = encoder.encode_records([record for record, keep in zip(records, scored) if keep])
+        return self._finish(model, matrix, type_codes, scored, DEFAULT_CHUNK_SIZE)
+
+    def decide_one(self, model, encoder, transaction):
+        """Decide a single transaction dict; returns ``(prob_fraud, label, block)``."""
+        decisions = self.decide_records(model, encoder, [transaction])
+        return float(decisions.prob_fraud[0]), decisions.labels[0], bool(decisions.block[0])
+
+    def _finish(self, model, matrix, type_codes, scored, chunk_size):
+        prob_fraud = np.zeros(len(type_codes), dtype=np.float64)
+        if len(matrix):
+            with timed("decision.predict", rows=len(matrix)):
+                prob_scored = np.empty(len(matrix), dtype=np.float64)
+                for start in range(0, len(matrix), chunk_size):
+                    prob_scored[start:start + chunk_size] = predict_fraud_proba(model, matrix[start:start + chunk_size])
+            prob_fraud[scored] = prob_scored
+        labels = labels_from_proba(model, prob_fraud)
+        block = prob_fraud > self._threshold_by_code[type_codes]
+        return Decisions(prob_fraud, labels, block, scored, type_codes)
+
+
+_engines = {}
+
+
+def get_decision_engine(path=DEFAULT_THRESHOLDS_PATH):
+    """Decision engine for a thresholds file, reloaded when the file changes."""
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _engines.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _engines[path] = (mtime, DecisionEngine(DecisionConfig.load(path)))
+    return cached[1]
@@ -1,19 +1,24 @@
 import streamlit as st
 import pandas as pd
-import pickle
 import base64
-import os
-import pygame  # ✅ Replaced simpleaudio with pygame
-import time  # For implementing real-time monitoring
-import pyttsx3 
-import lime  # 😊 Replaced SHAP with LIME
-from lime.lime_tabular import LimeTabularExplainer  # 😊 Import LIME explainer
+import numpy as np
+from alerts import AlertDispatcher, AudioSink, LogFileSink, WebhookSink
+from explain import get_explainer
+from feature_store import VelocityFeatureStore
+from ingest import RejectLog
+from model_registry import get_registry, load_model
+from monitor import DirectorySource, MonitorEngine, TailSource
+from monitor_view import MonitorFeed, MonitorView
+from decision import get_decision_engine
+from sources import session_tail
+from txn_store import TransactionStore
 
 # ✅ Load trained LightGBM model
-with open('/Users/i.seviantojensima/Desktop/Sem 6/Deep Learning/project/ex/lightgbm_model.pkl', 'rb') as file:
-    model, feature_names = pickle.load(file)
+loaded_model = load_model()  # ⚡ Loaded once per process, hot-reloaded when the .pkl changes
+model, feature_names, encoder = loaded_model.model, loaded_model.feature_names, loaded_model.encoder
 
 # ✅ Convert Local Image to Base64 for Background Image
+@st.cache_data  # ⚡ Encode the image once, not on every rerun
 def get_base64(img_path):
     with open(img_path, "rb") as file:
         return base64.b64encode(file.read()).decode()
@@ -80,27 +85,30 @@ with st.sidebar:
     oldbalanceDest = st.number_input("🏧 Old Balance (Destination)", min_value=0.0, step=0.01, format="%.2f")
     newbalanceDest = st.number_input("🏧 New Balance (Destination)", min_value=0.0, step=0.01, format="%.2f")
 
-# ✅ Function to Play Alarm Sound (WAV File)
-def trigger_alarm():
-    '''alarm_sound = "alarm.wav"
-    if os.path.exists(alarm_sound):
-        pygame.mixer.init()
-        pygame.mixer.music.load(alarm_sound)
-        pygame.mixer.music.play()
-    else:
-        st.error("⚠ Alarm sound file not found!")'''
-    
-    def trigger_alarm():
-        alarm_sound = "alarm.wav"
-        if os.path.exists(alarm_sound):
-            pygame.mixer.init()
-            pygame.mixer.music.load(alarm_sound)
-            pygame.mixer.music.play()
-
-    # ✅ Real-time voice alert
-    engine = pyttsx3.init()
-    engine.say("Alert! Fraudulent transaction detected!")
-    engine.runAndWait()
+@st.cache_resource  # ⚡ Per-account history shared by every monitoring session in this process
+def get_feature_store():
+    return VelocityFeatureStore(max_accounts=1_000_000)
+
+@st.cache_resource  # ⚡ Scored transactions are kept on disk (memory-mapped) for later analysis and rescoring
+def get_txn_store():
+    try:
+        return TransactionStore("transaction_store")
+    except RuntimeError:  # ✅ Another app process is the store's writer; monitoring still works without it
+        st.warning("⚠ transaction_store is in use by another process; scored transactions are not stored here.")
+        return None
+
+@st.cache_resource  # ⚡ One background engine polls every source and scores for all sessions
+def get_monitor_engine():
+    return MonitorEngine(get_registry(), store=get_txn_store(), feature_store=get_feature_store(),
+                         reject_log=RejectLog("ingest_rejects.csv")).start()  # ✅ Malformed rows are quarantined, not fatal
+
+# ✅ Alerts are queued for a background worker so scoring never waits on audio
+@st.cache_resource  # ⚡ One alert worker per process, shared across reruns
+def get_alert_dispatcher():
+    return AlertDispatcher([AudioSink("alert.mp3"), LogFileSink("fraud_alerts.log"), WebhookSink()])
+
+def trigger_alarm(transaction=None, prob_fraud=None):
+    get_alert_dispatcher().submit(transaction, prob_fraud)
 
 # ✅ Validate User Input with Styled Warning
 if st.button("🔍 Predict Fraud"):
@@ -109,32 +117,23 @@ if st.button("🔍 Predict Fraud"):
     elif any(val is None for val in [amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest]):
         st.markdown('<div class="warning-box">⚠ Please fill in all the required fields!</div>', unsafe_allow_html=True)
     else:
-        user_input = pd.DataFrame([{ "type": transaction_type, "amount": amount, "oldbalanceOrg": oldbalanceOrg,
-                                     "newbalanceOrig": newbalanceOrig, "oldbalanceDest": oldbalanceDest,
-                                     "newbalanceDest": newbalanceDest}])
-        user_input = pd.get_dummies(user_input)
-        for col in feature_names:
-            if col not in user_input.columns:
-                user_input[col] = 0
-        user_input = user_input[feature_names]
-        prediction = model.predict(user_input)[0]
+        transaction = { "type": transaction_type, "amount": amount, "oldbalanceOrg": oldbalanceOrg,
+                        "newbalanceOrig": newbalanceOrig, "oldbalanceDest": oldbalanceDest,
+                        "newbalanceDest": newbalanceDest}
+        # ⚡ One booster call (none for types cleared by the rule); demo keeps the model's 0.5 cut-off, not thresholds.json
+        prob_fraud, prediction, block = get_decision_engine().decide_one(model, encoder, transaction)
+        # ✅ Own row: the encoder (and its shared buffer) is used by every session's thread
+        user_row = encoder.encode_one(transaction, out=np.zeros((1, len(feature_names)), dtype=encoder.dtype))
+        user_input = pd.DataFrame(user_row, columns=feature_names)
 
         if prediction == 1:
             st.markdown('<div class="warning-box">🚨 FRAUDULENT TRANSACTION DETECTED!</div>', unsafe_allow_html=True)
-            trigger_alarm()
+            trigger_alarm(transaction, prob_fraud)
 
             st.subheader("🔍 Why was this transaction flagged?")
 
-            # 😊 Replaced SHAP with LIME
-            explainer = LimeTabularExplainer(
-                training_data=user_input.values,  # Use user input data
-                feature_names=feature_names,
-                class_names=["Legitimate", "Fraud"],
-                mode="classification"
-            )
-
-            exp = explainer.explain_instance(user_input.values[0], model.predict_proba, num_features=5)  # Get LIME explanation
-            explanation_data = exp.as_list()  # Extract feature contributions
+            # ⚡ LightGBM feature contributions: one booster call, cached explainer
+            explanation_data = get_explainer(loaded_model).explain(user_row)[0]  # (feature name, weight) pairs
 
             # ✅ Extract actual feature names
             explanation_sentences = []
@@ -177,13 +176,10 @@ if st.button("🔍 Predict Fraud"):
    
 
 
-with open('/Users/i.seviantojensima/Desktop/Sem 6/Deep Learning/project/ex/lightgbm_model.pkl', 'rb') as file:
-    model, feature_names = pickle.load(file)
-
 # ⭐ Added Prerequisite Section
 st.markdown("## 📌 File Upload Requirements")
 st.markdown("""
-Please ensure that the uploaded Excel file contains the following required columns:
+Please ensure that the uploaded Excel file (or CSV / JSON Lines file) contains the following required columns:
 - **type** (Transaction Type: "CASH_IN", "CASH_OUT", "PAYMENT", "TRANSFER")
 - **amount** (Transaction Amount)
 - **oldbalanceOrg** (Old Balance of Sender)
@@ -195,50 +191,47 @@ Please ensure that the uploaded Excel file contains the following required colum
 """)
 
 # ✅ File Upload Section
-uploaded_file = st.file_uploader("📂 Upload an Excel File for Real-Time Monitoring", type=["xlsx"])
+uploaded_files = st.file_uploader("📂 Upload Excel Files for Real-Time Monitoring", type=["xlsx", "csv", "jsonl"],
+                                  accept_multiple_files=True)
+watch_dir = st.text_input("📁 Or watch a folder of incoming files (optional)")
+poll_interval = st.number_input("⏱ Poll interval (seconds)", min_value=0.1, value=5.0, step=0.5)
+
+def real_time_monitoring(files, watch_dir=None, poll_interval=5.0):
+    engine = get_monitor_engine()
+    sources = [TailSource(session_tail(st.session_state, file), f"upload:{file.file_id}", poll_interval)
+               for file in files]  # ✅ Tail readers in session state remember rows already scored across reruns
+    if watch_dir:
+        sources.append(DirectorySource(watch_dir, poll_interval=poll_interval))
+    names = [engine.add_source(source) for source in sources]
+    subscription = engine.subscribe(sources=names)
+
+    # ✅ Fixed-size view redrawn in place, so long sessions do not pile up page elements
+    feed = MonitorFeed(capacity=200)
+    view = MonitorView(feed, refresh_seconds=1.0)
 
-def real_time_monitoring(file):
-    required_columns = ["type", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
-    
     try:
         while True:
-            file.seek(0)  # ✅ Reset file pointer to read latest data
-            data = pd.read_excel(file)
-
-            # ⭐ Added Validation for Required Columns
-            if not all(col in data.columns for col in required_columns):
-                missing_cols = [col for col in required_columns if col not in data.columns]
-                st.error(f"⚠ Missing required columns: {', '.join(missing_cols)}")
-                return  
-            
-               # 🔹 Display the latest transactions
-            st.subheader("📊 Latest Transactions Being Monitored:")
-            st.write(data.tail(5))  # ✅ Show last 5 transactions in a table
-
-            for _, latest_data in data.iterrows():
-                user_input = pd.DataFrame([latest_data])
-                user_input = pd.get_dummies(user_input)
-
-                for col in feature_names:
-                    if col not in user_input.columns:
-                        user_input[col] = 0
-                user_input = user_input[feature_names]
-                prediction = model.predict(user_input)[0]
-
-                st.markdown(f"**Processing Transaction:** {latest_data.to_dict()}")
-
-                # ⭐ Added Improved Fraud Detection Message
-                if prediction == 1:
-                    st.markdown('<div class="warning-box">🚨 FRAUDULENT TRANSACTION DETECTED!</div>', unsafe_allow_html=True)
-                    trigger_alarm()
-                else:
-                    st.markdown('<div class="success-box">✅ Transaction is Legitimate.</div>', unsafe_allow_html=True)
-
-                time.sleep(5)  # ✅ Delay 5 seconds before reading next row
+            for batch in subscription.get(timeout=min(poll_interval, view.refresh_seconds)):  # ✅ Only results; reading and scoring run in the engine
+                if batch.error is not None:
+                    feed.add_error(batch.source, batch.error)
+                    continue
+                flagged = batch.labels == 1  # ✅ The model's 0.5 cut-off, as demo always flagged
+
+                # ⚡ Explain every flagged row in one batch
+                reasons = get_explainer(loaded_model).explain_flagged(encoder, batch.data, flagged, num_features=3)
+                for index in np.flatnonzero(flagged):
+                    trigger_alarm(batch.data.iloc[index].to_dict(), batch.prob_fraud[index])
+                feed.add(batch, flagged, reasons)
+
+            view.refresh(queue_depth=engine.queue_depth, dropped=subscription.dropped, drift=engine.drift_report())
 
     except Exception as e:
         st.error(f"⚠ Error occurred: {str(e)}")
+    finally:
+        engine.unsubscribe(subscription)
+        for name in names:
+            engine.remove_source(name)
 
-if uploaded_file is not None and st.button("🚨 Start Real-Time Monitoring"):
+if (uploaded_files or watch_dir) and st.button("🚨 Start Real-Time Monitoring"):
     st.write("✅ Real-time monitoring started...")
-    real_time_monitoring(uploaded_file)
+    real_time_monitoring(uploaded_files, watch_dir, poll_interval)
@@ -0,0 +1,291 @@
+"""Data and score drift against the training reference, from constant-memory streaming histograms.
+
+    python drift.py fraud.csv --model lightgbm_model.pkl   # writes lightgbm_model.drift.json
+
+The reference profile sits next to the model artifact (``<model>.drift.json``)
+and is written by train.py. It holds quantile bin edges and bin fractions
+for every numeric column, the share of each transaction type and a histogram
+of ``prob_fraud`` as the decision engine produces it (0 for rule-cleared
+types). At run time each scored batch only adds to fixed count arrays over
+those bins. ``report()`` compares the counts of the last one or two windows
+of ``window_rows`` rows with the reference through PSI and KS.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from features import REQUIRED_COLUMNS, TRANSACTION_TYPES, FeatureEncoder
+from instrumentation import timed
+
+NUMERIC_COLUMNS = ["step"] + REQUIRED_COLUMNS[1:]
+# ✅ Fixed score bins: the first one holds the exact zeros of rule-decided rows
+PROB_EDGES = [1e-12, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 0.7, 0.9]
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+KS_DRIFT = 0.1
+STATUS_ORDER = ["ok", "warning", "drift"]
+SMALL_BATCH = 16  # rows up to which histograms are updated value by value
+
+
+def reference_path_for(model_path):
+    """Where the reference profile of a .pkl or forest-folder artifact lives."""
+    return os.path.splitext(os.path.normpath(model_path))[0] + ".drift.json"
+
+
+def _bin_counts(edges, values):
+    """Rows per bin, bin ``i`` holding ``edges[i - 1] <= value < edges[i]``.
+
+    ⚡ For large arrays one comparison pass per edge is about 10x cheaper than
+    searchsorted + bincount with the ~10 edges used here; for small ones the
+    two calls beat one call per edge.
+    """
+    if len(values) <= 2048:
+        return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    above = [np.count_nonzero(values >= edge) for edge in edges.tolist()]
+    return -np.diff([len(values), *above, 0])
+
+
+def build_profile(data, prob_fraud, n_bins=10, version=None):
+    """Reference profile of a frame with ``type`` and the amount columns (``step`` if present)."""
+    profile = {"version": version, "rows": len(data), "features": {}}
+    for name in NUMERIC_COLUMNS:
+        if name not in data.columns:
+            continue
+        values = data[name].to_numpy(dtype=np.float64)
+        # ✅ Balances are 0 for a large share of rows, so repeated quantiles collapse into one edge
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = _bin_counts(edges, values)
+        profile["features"][name] = {"edges": edges.tolist(), "fractions": (counts / len(values)).tolist()}
+
+    codes = pd.Categorical(data["type"], categories=TRANSACTION_TYPES).codes
+    type_counts = np.bincount(codes[codes >= 0], minlength=len(TRANSACTION_TYPES))
+    profile["type"] = {"categories": TRANSACTION_TYPES, "fractions": (type_counts / len(data)).tolist()}
+    prob_counts = _bin_counts(np.array(PROB_EDGES), np.asarray(prob_fraud, dtype=np.float64))
+    profile["prob_fraud"] = {"edges": PROB_EDGES, "fractions": (prob_counts / len(data)).tolist()}
+    return profile
+
+
+def frame_from_matrix(matrix, feature_names):
+    """Transactions back from an encoded training matrix (numeric columns plus ``type`` from the dummies)."""
+    data = pd.DataFrame({name: np.asarray(matrix[:, i], dtype=np.float64) for i, name in enumerate(feature_names)
+                         if not name.startswith("type_")})
+    dummies = [i for i, name in enumerate(feature_names) if name.startswith("type_")]
+    names = np.array([feature_names[i][len("type_"):] for i in dummies])
+    dropped = next(t for t in TRANSACTION_TYPES if t not in names)  # ✅ get_dummies(drop_first=True) drops CASH_IN
+    one_hot = np.asarray(matrix[:, dummies]) > 0.5
+    data.insert(0, "type", np.where(one_hot.any(axis=1), names[one_hot.argmax(axis=1)], dropped))
+    return data
+
+
+def profile_model(model, data, feature_names, version=None):
+    """Score ``data`` like the live paths do (through the decision engine) and profile it."""
+    from decision import get_decision_engine
+
+    decisions = get_decision_engine().decide(model, FeatureEncoder(feature_names), data)
+    return build_profile(data, decisions.prob_fraud, version=version)
+
+
+def write_profile(profile, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(profile, file, indent=2)
+    os.replace(tmp_path, path)  # ✅ Readers never see a half-written profile
+    return path
+
+
+def psi(expected, actual, eps=1e-4):
+    """Population stability index between two vectors of bin fractions."""
+    expected = np.clip(expected, eps, None)
+    actual = np.clip(actual, eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks(expected, actual):
+    """Kolmogorov-Smirnov distance, evaluated at the bin edges."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+class _Histogram:
+    """Counts over fixed bin edges, for the current and the previous window."""
+
+    __slots__ = ("edges", "edge_list", "reference", "counts", "previous")
+
+    def __init__(self, edges, reference):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.edge_list = self.edges.tolist()
+        self.reference = np.asarray(reference, dtype=np.float64)
+        self.counts = np.zeros(len(self.reference), dtype=np.int64)
+        self.previous = np.zeros_like(self.counts)
+
+    def add(self, values):
+        if len(values) > SMALL_BATCH:
+            self.counts += _bin_counts(self.edges, values)
+            return
+        for value in values.tolist():  # ⚡ A few rows: plain bisect beats a dozen NumPy calls
+            self.counts[bisect_right(self.edge_list, value)] += 1
+
+    def roll(self):
+        self.previous, self.counts = self.counts, self.previous
+        self.counts[:] = 0
+
+    def compare(self, with_ks=True):
+        counts = self.counts + self.previous
+        total = counts.sum()
+        if not total:
+            return None
+        actual = counts / total
+        result = {"rows": int(total), "psi": round(psi(self.reference, actual), 4)}
+        if with_ks:
+            result["ks"] = round(ks(self.reference, actual), 4)
+        status = "drift" if result["psi"] >= PSI_DRIFT or result.get("ks", 0) >= KS_DRIFT else \
+            "warning" if result["psi"] >= PSI_WARNING else "ok"
+        result["status"] = status
+        return result
+
+
+class DriftMonitor:
+    """Streaming histograms of live traffic compared with a reference profile.
+
+    Memory is a few count arrays whatever the volume; an update is one
+    comparison pass per bin edge and column. Counts cover the current
+    window plus the previous one, so the signal follows the recent
+    ``window_rows`` to ``2 * window_rows`` rows.
+    """
+
+    def __init__(self, profile, window_rows=100_000, min_rows=1_000):
+        self.profile = profile
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+        self.features = {name: _Histogram(spec["edges"], spec["fractions"])
+                         for name, spec in profile["features"].items()}
+        self.types = _Histogram(np.arange(len(TRANSACTION_TYPES) - 1) + 0.5, profile["type"]["fractions"])
+        self.prob_fraud = _Histogram(profile["prob_fraud"]["edges"], profile["prob_fraud"]["fractions"])
+        self.rows_total = 0
+        self._window_fill = 0
+        self._code_by_type = {t: i for i, t in enumerate(TRANSACTION_TYPES)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path) as file:
+            return cls(json.load(file), **kwargs)
+
+    def update(self, data, prob_fraud, type_codes=None):
+        """Add a scored frame (``type`` and amount columns) to the histograms.
+
+        Pass the decision engine's ``type_codes`` when available; encoding the
+        type strings again costs more than the histograms.
+        """
+        if type_codes is None:
+            type_codes = pd.Categorical(data["type"], categories=TRANSACTION_TYPES).codes
+        columns = {name: data[name].to_numpy(dtype=np.float64) for name in self.features if name in data.columns}
+        self.update_columns(columns, type_codes, prob_fraud)
+
+    def update_records(self, records, prob_fraud, type_codes=None):
+        """Add scored transaction dicts (the scoring service's input)."""
+        codes = type_codes if type_codes is not None else \
+            np.array([self._code_by_type.get(record.get("type"), -1) for record in records], dtype=np.int8)
+        # ✅ A record without an optional column (``step``) counts as 0 there, the value the encoder gives it
+        columns = {name: np.fromiter((record.get(name, 0.0) for record in records), np.float64, len(records))
+                   for name in self.features if any(name in record for record in records)}
+        self.update_columns(columns, codes, prob_fraud)
+
+    def update_columns(self, columns, type_codes, prob_fraud):
+        n = len(type_codes)
+        if not n:
+            return
+        with timed("drift.update", rows=n), self._lock:
+            for name, values in columns.items():
+                self.features[name].add(values)
+            self.types.add(type_codes[type_codes >= 0])
+            self.prob_fraud.add(np.asarray(prob_fraud, dtype=np.float64))
+            self.rows_total += n
+            self._window_fill += n
+            if self._window_fill >= self.window_rows:
+                for histogram in self._histograms():
+                    histogram.roll()
+                self._window_fill = 0
+
+    def report(self):
+        """PSI/KS per feature, type mix and score histogram, plus the overall status."""
+        with self._lock:
+            signals = {name: histogram.compare() for name, histogram in self.features.items()}
+            signals["type"] = self.types.compare(with_ks=False)  # ✅ Types have no order, KS would be meaningless
+            signals["prob_fraud"] = self.prob_fraud.compare()
+            rows = int(self.prob_fraud.counts.sum() + self.prob_fraud.previous.sum())
+        signals = {name: signal for name, signal in signals.items() if signal is not None}
+        if rows < self.min_rows:
+            status = "warming up"
+        else:
+            status = max((s["status"] for s in signals.values()), key=STATUS_ORDER.index, default="ok")
+        return {
+            "status": status,
+            "rows": rows,
+            "rows_total": self.rows_total,
+            "reference_version": self.profile.get("version"),
+            "drifted": [name for name, s in signals.items() if s["status"] != "ok"] if rows >= self.min_rows else [],
+            "signals": signals,
+        }
+
+    def _histograms(self):
+        return [*self.features.values(), self.types, self.prob_fraud]
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_drift_monitor(model_path):
+    """Process-wide drift monitor for a model artifact, or None when it has no reference profile.
+
+    A new reference (a retrained model) replaces the monitor and its counts.
+    """
+    path = reference_path_for(model_path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _monitors_lock:
+        cached = _monitors.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _monitors[path] = (mtime, DriftMonitor.load(path))
+        return cached[1]
+
+
+def format_report(report):
+    """One line per signal, for the command-line tools."""
+    lines = [f"drift: {report['status']} over {report['rows']:,} recent rows"]
+    for name, signal in report["signals"].items():
+        ks_text = f"  KS {signal['ks']:.3f}" if "ks" in signal else ""
+        lines.append(f"   {name:<16} PSI {signal['psi']:.3f}{ks_text}  {signal['status']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="training data (fraud.csv) or any CSV/Parquet the model should be compared to")
+    parser.add_argument("--model", default="lightgbm_model.pkl")
+    parser.add_argument("--out", help="default: next to the model, <model>.drift.json")
+    args = parser.parse_args()
+
+    from ingest import read_table
+    from model_registry import read_artifact, read_version
+
+    start = time.perf_counter()
+    model, feature_names = read_artifact(args.model)
+    result = read_table(args.csv)
+    if result.missing_columns:
+        parser.error(f"missing required columns: {', '.join(result.missing_columns)}")
+    profile = profile_model(model, result.data, feature_names, version=read_version(args.model))
+    path = write_profile(profile, args.out or reference_path_for(args.model))
+    print(f"✅ Reference profile of {len(result.data):,} rows written to {path} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,25 @@
 import streamlit as st
 import pandas as pd
-import pickle
 import base64
-import time
-import pyttsx3
-from lime.lime_tabular import LimeTabularExplainer
-from gtts import gTTS
+import numpy as np
 import os
+from alerts import AlertDispatcher, AudioSink, LogFileSink, WebhookSink, ensure_voice_alert
+from explain import get_explainer
+from feature_store import VelocityFeatureStore
+from ingest import RejectLog
+from model_registry import get_registry, load_model
+from monitor import DirectorySource, MonitorEngine, TailSource
+from monitor_view import MonitorFeed, MonitorView
+from decision import get_decision_engine
+from sources import session_tail
+from txn_store import TransactionStore
 
 # ✅ Load trained LightGBM model
-with open('lightgbm_model.pkl', 'rb') as file:
-    model, feature_names = pickle.load(file)
+loaded_model = load_model()  # ⚡ Loaded once per process, hot-reloaded when the .pkl changes
+model, feature_names, encoder = loaded_model.model, loaded_model.feature_names, loaded_model.encoder
 
 # ✅ Convert Local Image to Base64 for Background Image
+@st.cache_data  # ⚡ Encode the image once, not on every rerun
 def get_base64(img_path):
     with open(img_path, "rb") as file:
         return base64.b64encode(file.read()).decode()
@@ -79,11 +86,31 @@ with st.sidebar:
     oldbalanceDest = st.number_input("🏧 Old Balance (Destination)", min_value=0.0, step=0.01, format="%.2f")
     newbalanceDest = st.number_input("🏧 New Balance (Destination)", min_value=0.0, step=0.01, format="%.2f")
 
-# ✅ Function to Play Alarm Sound (Voice Alert)
-def trigger_alarm():
-    tts = gTTS("Alert! Fraudulent transaction detected!", lang="en")
-    tts.save("alert.mp3")
-    #os.system("start alert.mp3")
+@st.cache_resource  # ⚡ Per-account history shared by every monitoring session in this process
+def get_feature_store():
+    return VelocityFeatureStore(max_accounts=1_000_000)
+
+@st.cache_resource  # ⚡ Scored transactions are kept on disk (memory-mapped) for later analysis and rescoring
+def get_txn_store():
+    try:
+        return TransactionStore("transaction_store")
+    except RuntimeError:  # ✅ Another app process is the store's writer; monitoring still works without it
+        st.warning("⚠ transaction_store is in use by another process; scored transactions are not stored here.")
+        return None
+
+@st.cache_resource  # ⚡ One background engine polls every source and scores for all sessions
+def get_monitor_engine():
+    return MonitorEngine(get_registry(), store=get_txn_store(), feature_store=get_feature_store(),
+                         reject_log=RejectLog("ingest_rejects.csv")).start()  # ✅ Malformed rows are quarantined, not fatal
+
+# ✅ Voice alert is rendered once and played by a background worker, so scoring never waits on it
+@st.cache_resource  # ⚡ One alert worker per process, shared across reruns
+def get_alert_dispatcher():
+    voice_alert = ensure_voice_alert("alert.mp3")
+    return AlertDispatcher([AudioSink(voice_alert), LogFileSink("fraud_alerts.log"), WebhookSink()])
+
+def trigger_alarm(transaction=None, prob_fraud=None):
+    get_alert_dispatcher().submit(transaction, prob_fraud)
 
 # ✅ Fraud Prediction for Manual Input
 if st.button("🔍 Predict Fraud"):
@@ -92,39 +119,28 @@ if st.button("🔍 Predict Fraud"):
     elif any(val is None for val in [amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest]):
         st.markdown('<div class="warning-box">⚠ Please fill in all the required fields!</div>', unsafe_allow_html=True)
     else:
-        user_input = pd.DataFrame([{ 
+        transaction = {
             "type": transaction_type, "amount": amount, "oldbalanceOrg": oldbalanceOrg,
             "newbalanceOrig": newbalanceOrig, "oldbalanceDest": oldbalanceDest,
             "newbalanceDest": newbalanceDest
-        }])
-        user_input = pd.get_dummies(user_input)
-        for col in feature_names:
-            if col not in user_input.columns:
-                user_input[col] = 0
-        user_input = user_input[feature_names]
-        prediction = model.predict(user_input)[0]
+        }
 
-        # Assuming the model outputs a probability for fraud (class 1)
-        prob_fraud = model.predict_proba(user_input)[0][1]  # Probability of being fraudulent
+        # ⚡ One booster call (none for types cleared by the rule) gives probability, label and decision
+        prob_fraud, prediction, block = get_decision_engine().decide_one(model, encoder, transaction)
+        # ✅ Own row: the encoder (and its shared buffer) is used by every session's thread
+        user_row = encoder.encode_one(transaction, out=np.zeros((1, len(feature_names)), dtype=encoder.dtype))
+        user_input = pd.DataFrame(user_row, columns=feature_names)
 
         # Display the risk score
         st.write(f"*Risk Score (Probability of Fraud):* {prob_fraud:.2f}")
 
-        if prob_fraud > 0.7:  # If the probability is above 70%, block the transaction
+        if block:  # Above the threshold for this transaction type (thresholds.json), block the transaction
             st.markdown('<div class="warning-box">🚨 BLOCKED!</div>', unsafe_allow_html=True)
-            trigger_alarm()
+            trigger_alarm(prob_fraud=prob_fraud)
             st.subheader("🔍 Why was this transaction flagged and blocked?")
 
-            # 😊 Replaced SHAP with LIME
-            explainer = LimeTabularExplainer(
-                training_data=user_input.values,  # Use user input data
-                feature_names=feature_names,
-                class_names=["Legitimate", "Fraud"],
-                mode="classification"
-            )
-
-            exp = explainer.explain_instance(user_input.values[0], model.predict_proba, num_features=5)  # Get LIME explanation
-            explanation_data = exp.as_list()  # Extract feature contributions
+            # ⚡ LightGBM feature contributions: one booster call, cached explainer
+            explanation_data = get_explainer(loaded_model).explain(user_row)[0]  # (feature name, weight) pairs
 
             # ✅ Extract actual feature names
             explanation_sentences = []
@@ -160,13 +176,10 @@ if st.button("🔍 Predict Fraud"):
 # ✅ Real-Time Monitoring Section (Hidden initially)
 st.subheader("📡 Real-Time Monitoring")
 
-with open('lightgbm_model.pkl', 'rb') as file:
-    model, feature_names = pickle.load(file)
-
 # ⭐ Added Prerequisite Section
 st.markdown("## 📌 File Upload Requirements")
 st.markdown(""" 
-Please ensure that the uploaded Excel file contains the following required columns:
+Please ensure that the uploaded Excel file (or CSV / JSON Lines file) contains the following required columns:
 - type (Transaction Type: "CASH_IN", "CASH_OUT", "PAYMENT", "TRANSFER")
 - amount (Transaction Amount)
 - oldbalanceOrg (Old Balance of Sender)
@@ -181,60 +194,51 @@ Please ensure that the uploaded Excel file contains the following required colum
 if "uploaded_file" not in st.session_state:
     st.session_state.uploaded_file = None
 
-uploaded_file = st.file_uploader("📂 Upload an Excel File for Real-Time Monitoring", type=["xlsx"])
+uploaded_file = st.file_uploader("📂 Upload Excel Files for Real-Time Monitoring", type=["xlsx", "csv", "jsonl"],
+                                 accept_multiple_files=True)
+watch_dir = st.text_input("📁 Or watch a folder of incoming files (optional)")
+poll_interval = st.number_input("⏱ Poll interval (seconds)", min_value=0.1, value=5.0, step=0.5)
 
 if uploaded_file:
-    st.session_state.uploaded_file = uploaded_file  # Save the uploaded file to session state
+    st.session_state.uploaded_file = uploaded_file  # Save the uploaded files to session state
 
-if st.session_state.uploaded_file is not None:
+if st.session_state.uploaded_file or watch_dir:
     if st.button("🚨 Start Monitoring"):
         # ✅ Real-Time Monitoring Logic
-        def real_time_monitoring(file):
-            required_columns = ["type", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+        def real_time_monitoring(files, watch_dir=None, poll_interval=5.0):
+            engine = get_monitor_engine()
+            sources = [TailSource(session_tail(st.session_state, file), f"upload:{file.file_id}", poll_interval)
+                       for file in files]  # ✅ Tail readers in session state remember rows already scored across reruns
+            if watch_dir:
+                sources.append(DirectorySource(watch_dir, poll_interval=poll_interval))
+            names = [engine.add_source(source) for source in sources]
+            subscription = engine.subscribe(sources=names)
+
+            # ✅ Fixed-size view redrawn in place, so long sessions do not pile up page elements
+            feed = MonitorFeed(capacity=200)
+            view = MonitorView(feed, refresh_seconds=1.0)
 
             try:
                 while True:
-                    file.seek(0)  # ✅ Reset file pointer to read latest data
-                    data = pd.read_excel(file)
-
-                    # ⭐ Validate Required Columns
-                    if not all(col in data.columns for col in required_columns):
-                        missing_cols = [col for col in required_columns if col not in data.columns]
-                        st.error(f"⚠ Missing required columns: {', '.join(missing_cols)}")
-                        return  
-
-                    # 🔹 Display Latest Transactions
-                    st.subheader("📊 Latest Transactions Being Monitored:")
-                    st.write(data.tail(5))  # ✅ Show last 5 transactions in a table
-
-                    for _, latest_data in data.iterrows():
-                        user_input = pd.DataFrame([latest_data])
-                        user_input = pd.get_dummies(user_input)
-
-                        for col in feature_names:
-                            if col not in user_input.columns:
-                                user_input[col] = 0
-                        user_input = user_input[feature_names]
-                        prediction = model.predict(user_input)[0]
-
-                        # Assuming the model outputs a probability for fraud (class 1)
-                        prob_fraud = model.predict_proba(user_input)[0][1]  # Probability of being fraudulent
-
-                        # Display the risk score
-                        st.write(f"*Risk Score (Probability of Fraud):* {prob_fraud:.2f}")
-
-                        st.markdown(f"Processing Transaction: {latest_data.to_dict()}")
+                    for batch in subscription.get(timeout=min(poll_interval, view.refresh_seconds)):  # ✅ Only results; reading and scoring run in the engine
+                        if batch.error is not None:
+                            feed.add_error(batch.source, batch.error)
+                            continue
+                        flagged = batch.block  # ✅ Blocked when above the threshold for its type (thresholds.json)
 
-                        # ⭐ Fraud Detection Message
-                        if prob_fraud > 0.7:  # If the probability is above 70%, block the transaction
-                            st.markdown('<div class="warning-box">🚨 FRAUDULENT TRANSACTION DETECTED!</div>', unsafe_allow_html=True)
-                            trigger_alarm()
-                        else:
-                            st.markdown('<div class="success-box">✅ Transaction is Legitimate.</div>', unsafe_allow_html=True)
+                        # ⚡ Explain every flagged row in one batch
+                        reasons = get_explainer(loaded_model).explain_flagged(encoder, batch.data, flagged, num_features=3)
+                        for index in np.flatnonzero(flagged):
+                            trigger_alarm(batch.data.iloc[index].to_dict(), batch.prob_fraud[index])
+                        feed.add(batch, flagged, reasons)
 
-                        time.sleep(5)  # ✅ Delay 5 seconds before reading next row
+                    view.refresh(queue_depth=engine.queue_depth, dropped=subscription.dropped, drift=engine.drift_report())
 
             except Exception as e:
                 st.error(f"⚠ Error occurred: {str(e)}")
+            finally:
+                engine.unsubscribe(subscription)
+                for name in names:
+                    engine.remove_source(name)
 
-        real_time_monitoring(st.session_state.uploaded_file)
\ No newline at end of file
+        real_time_monitoring(st.session_state.uploaded_file or [], watch_dir, poll_interval)
@@ -0,0 +1,110 @@
+import os
+import threading
+
+import numpy as np
+
+from instrumentation import timed
+from scoring import predict_fraud_proba
+
+DEFAULT_REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference_sample.npz")
+
+
+def save_reference_sample(matrix, feature_names, size=5000, path=DEFAULT_REFERENCE_PATH, seed=42):
+    """Save a random sample of rows of an encoded training matrix as LIME background data."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(matrix), size=min(size, len(matrix)), replace=False))
+    np.savez_compressed(path, sample=np.asarray(matrix[rows]), feature_names=np.array(feature_names))
+    return path
+
+
+def build_reference_sample(x, encoder, size=5000, path=DEFAULT_REFERENCE_PATH, seed=42):
+    """Same as save_reference_sample, from the training frame (before get_dummies) used in the notebook."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(x), size=min(size, len(x)), replace=False))
+    return save_reference_sample(encoder.encode_frame(x.iloc[rows]), encoder.feature_names, size, path, seed)
+
+
+def top_features(weights, feature_names, num_features):
+    """The ``num_features`` largest weights by absolute value as ``(feature_name, weight)`` pairs."""
+    order = np.argsort(-np.abs(weights))[:num_features]
+    return [(feature_names[i], float(weights[i])) for i in order]
+
+
+class FraudExplainer:
+    """Explains why rows were scored as fraud.
+
+    ``method="contrib"`` (default) uses LightGBM's per-feature contributions,
+    one booster call for the whole batch; exported forests compute their own
+    path contributions. ``method="lime"`` builds a single
+    LimeTabularExplainer on a reference sample of the training data and reuses
+    it for every explanation.
+    """
+
+    def __init__(self, model, encoder, method="contrib", reference_path=DEFAULT_REFERENCE_PATH, num_samples=5000):
+        self.model = model
+        self.feature_names = encoder.feature_names
+        self.method = method
+        self.num_samples = num_samples
+        self._lime = None
+
+        if method == "lime":
+            from lime.lime_tabular import LimeTabularExplainer
+
+            if not os.path.exists(reference_path):
+                raise FileNotFoundError(f"LIME needs a reference sample of the training data: {reference_path}")
+            reference = np.load(reference_path)["sample"]
+            self._lime = LimeTabularExplainer(
+                training_data=reference,
+                feature_names=self.feature_names,
+                class_names=["Legitimate", "Fraud"],
+                mode="classification",
+            )
+        elif method != "contrib":
+            raise ValueError(f"unknown explanation method: {method!r}")
+        elif getattr(model, "node_value", True) is None:
+            raise ValueError("this exported forest has no node values; re-export it with tree_export.py "
+                             "to explain its decisions")
+
+    def explain(self, matrix, num_features=5):
+        """Return one list of ``(feature_name, weight)`` pairs per row of ``matrix``."""
+        with timed(f"explain.{self.method}", rows=len(matrix)):
+            return self._explain(matrix, num_features)
+
+    def _explain(self, matrix, num_features):
+        if self.method == "contrib":
+            if hasattr(self.model, "predict_contrib"):  # ✅ Exported forests (tree_export.py), no lightgbm needed
+                contributions = self.model.predict_contrib(matrix)[:, :-1]
+            else:
+                booster = getattr(self.model, "booster_", self.model)
+                contributions = booster.predict(matrix, pred_contrib=True)[:, :-1]  # last column is the bias
+            return [top_features(row, self.feature_names, num_features) for row in contributions]
+
+        explanations = []
+        for row in matrix:
+            exp = self._lime.explain_instance(row, self._predict_proba, num_features=num_features,
+                                              num_samples=self.num_samples)
+            explanations.append([(self.feature_names[i], float(w)) for i, w in exp.as_map()[1]])
+        return explanations
+
+    def explain_flagged(self, encoder, data, flagged, num_features=5):
+        """Explain only the rows of ``data`` selected by the boolean array ``flagged``, in one batch."""
+        if not flagged.any():
+            return []
+        return self.explain(encoder.encode_frame(data[flagged]), num_features=num_features)
+
+    def _predict_proba(self, matrix):
+        prob_fraud = predict_fraud_proba(self.model, matrix)
+        return np.column_stack([1.0 - prob_fraud, prob_fraud])
+
+
+_explainers = {}
+_explainers_lock = threading.Lock()
+
+
+def get_explainer(loaded_model, method="contrib"):
+    """Explainer for a registry-loaded model, built once per model checksum and method."""
+    key = (loaded_model.checksum, method)
+    with _explainers_lock:
+        if key not in _explainers:
+            _explainers[key] = FraudExplainer(loaded_model.model, loaded_model.encoder, method=method)
+        return _explainers[key]
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+# ✅ Transaction types seen in the training data (fraud.csv)
+TRANSACTION_TYPES = ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]
+
+# ✅ Columns every uploaded transaction file must contain
+REQUIRED_COLUMNS = ["type", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+
+
+class FeatureEncoder:
+    """Writes transactions straight into the model's feature layout.
+
+    Built once from the ``feature_names`` saved next to the model, it gives the
+    same values as ``pd.get_dummies`` followed by zero padding and reindexing:
+    numeric features the input does not carry (e.g. ``step``) are 0, and a type
+    without a column (``CASH_IN`` was dropped by ``drop_first``) or an unknown
+    type leaves every ``type_*`` slot at 0.
+    """
+
+    def __init__(self, feature_names, dtype=np.float64):
+        self.feature_names = list(feature_names)
+        self.dtype = dtype
+        self.column_index = {name: i for i, name in enumerate(self.feature_names)}
+
+        # ✅ Numeric inputs as (column name, slot) pairs
+        self.numeric_slots = [(name, i) for i, name in enumerate(self.feature_names) if not name.startswith("type_")]
+
+        # ✅ One-hot slot per transaction type, -1 when the model has no column for it
+        self.type_slots = {t: self.column_index.get(f"type_{t}", -1) for t in TRANSACTION_TYPES}
+        self._slot_by_code = np.array([self.type_slots[t] for t in TRANSACTION_TYPES], dtype=np.intp)
+
+        self._row = np.zeros((1, len(self.feature_names)), dtype=dtype)
+
+    @classmethod
+    def from_artifact(cls, artifact, dtype=np.float64):
+        """Build an encoder from the ``(model, feature_names)`` tuple in lightgbm_model.pkl."""
+        _, feature_names = artifact
+        return cls(feature_names, dtype=dtype)
+
+    def encode_one(self, transaction, out=None):
+        """Encode one transaction dict into a ``(1, n_features)`` row.
+
+        Without ``out`` the encoder's own row buffer is reused, so the result is
+        only valid until the next call.
+        """
+        row = self._row if out is None else out
+        row.fill(0)
+        values = row[0]
+
+        for name, slot in self.numeric_slots:
+            if name in transaction:
+                values[slot] = transaction[name]
+
+        slot = self.type_slots.get(transaction.get("type"), -1)
+        if slot >= 0:
+            values[slot] = 1
+        return row
+
+    def encode_records(self, records, out=None):
+        """Encode a list of transaction dicts into a ``(len(records), n_features)`` matrix."""
+        if out is None:
+            out = np.empty((len(records), len(self.feature_names)), dtype=self.dtype)
+        for i, transaction in enumerate(records):
+            self.encode_one(transaction, out=out[i:i + 1])
+        return out
+
+    def encode_frame(self, data, out=None):
+        """Encode a frame of transactions into a C-contiguous feature matrix in one pass."""
+        columns = {name: data[name].to_numpy(dtype=self.dtype) for name, _ in self.numeric_slots if name in data.columns}
+        type_codes = None
+        if "type" in data.columns:
+            type_codes = pd.Categorical(data["type"], categories=TRANSACTION_TYPES).codes
+        return self.encode_columns(columns, type_codes, n_rows=len(data), out=out)
+
+    def encode_columns(self, columns, type_codes=None, n_rows=None, out=None):
+        """Encode column arrays (e.g. memory-mapped store segments) into a feature matrix.
+
+        ``type_codes`` are positions in TRANSACTION_TYPES, -1 for unknown types.
+        """
+        if n_rows is None:
+            n_rows = len(type_codes) if type_codes is not None else len(next(iter(columns.values())))
+        if out is None:
+            out = np.zeros((n_rows, len(self.feature_names)), dtype=self.dtype)
+        else:
+            out.fill(0)
+
+        for name, slot in self.numeric_slots:
+            if name in columns:
+                out[:, slot] = columns[name]
+
+        if type_codes is not None:
+            rows = np.flatnonzero(type_codes >= 0)
+            slots = self._slot_by_code[type_codes[rows]]
+            keep = slots >= 0
+            out[rows[keep], slots[keep]] = 1
+        return out
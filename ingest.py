@@ -0,0 +1,226 @@
+"""Schema-checked ingestion of transaction spreadsheets and tables.
+
+    python ingest.py transactions.xlsx transactions.parquet   # convert once, monitor the fast format
+
+Excel sheets are streamed straight from the sheet XML and only the six
+REQUIRED_COLUMNS (plus the optional account/step columns) are converted. Every
+frame is validated: ``type`` is normalised to upper case and must be a known
+transaction type, the amounts (and ``step``, when present) must be finite
+numbers. Rows that fail are moved to a reject report instead of stopping
+the monitor.
+"""
+import argparse
+import os
+import posixpath
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from features import REQUIRED_COLUMNS, TRANSACTION_TYPES
+
+# ✅ Extra columns kept when a sheet has them (velocity features and the hour of the transaction)
+OPTIONAL_COLUMNS = ["step", "nameOrig", "nameDest"]
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[1:]
+# ✅ One layout for the reject report, so rows from different sources and raw unparseable lines line up
+REJECT_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS + ["line", "reject_reason"]
+
+
+@dataclass
+class IngestResult:
+    data: pd.DataFrame  # valid rows, REQUIRED_COLUMNS as str / float64
+    rejects: pd.DataFrame  # invalid rows with a "reject_reason" column
+    missing_columns: list
+
+
+def validate_frame(data):
+    """Split a frame into valid rows (fixed dtypes) and rejected rows with the reason."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in data.columns]
+    if missing:
+        return IngestResult(data.iloc[:0], data.assign(reject_reason="missing columns"), missing)
+
+    clean = data.copy()
+    reasons = pd.Series("", index=data.index, dtype=object)
+
+    clean["type"] = clean["type"].astype(str).str.strip().str.upper()
+    unknown = ~clean["type"].isin(TRANSACTION_TYPES)
+    reasons[unknown] = "unknown type; "
+
+    # ✅ ``step`` is optional, but it is a model feature, so it must be a number when a file carries it
+    for col in NUMERIC_COLUMNS + [col for col in ("step",) if col in clean.columns]:
+        values = pd.to_numeric(clean[col], errors="coerce").astype(np.float64)
+        bad = ~np.isfinite(values.to_numpy())
+        reasons[bad] += f"{col} not a finite number; "
+        clean[col] = values
+
+    rejected = (reasons != "").to_numpy()
+    # ✅ Rejects keep the raw values, so the report shows what was actually in the file
+    rejects = data[rejected].assign(reject_reason=reasons[rejected].str.rstrip("; "))
+    return IngestResult(clean[~rejected], rejects, [])
+
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+
+def _sheet_path(archive, sheet=None):
+    """Path inside the .xlsx of the named sheet, or of the first one (what pd.read_excel reads)."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    sheets = workbook.findall(f"{_NS}sheets/{_NS}sheet")
+    chosen = next((s for s in sheets if s.get("name") == sheet), None) if sheet else sheets[0]
+    if chosen is None:
+        raise ValueError(f"no sheet named {sheet!r}")
+    relations = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    target = next(r.get("Target") for r in relations if r.get("Id") == chosen.get(_REL_ID))
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def _shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    root = ET.fromstring(archive.read("xl/sharedStrings.xml"))
+    return ["".join(t.text or "" for t in item.iter(f"{_NS}t")) for item in root.iter(f"{_NS}si")]
+
+
+def _cell_value(cell, shared):
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{_NS}t"))
+    value = cell.find(f"{_NS}v")
+    if value is None:
+        return None
+    if kind == "s":
+        return shared[int(value.text)]
+    if kind in (None, "n"):
+        return float(value.text)
+    if kind == "b":
+        return value.text == "1"
+    return value.text  # formula strings and error codes such as #VALUE!
+
+
+def _has_value(cell):
+    """Whether ``_cell_value`` would return something, without converting the cell."""
+    return cell.get("t") == "inlineStr" or cell.find(f"{_NS}v") is not None
+
+
+def _cell_column(cell, position):
+    ref = cell.get("r")  # optional in the format; fall back to the cell's position
+    return ref.rstrip("0123456789") if ref else position
+
+
+def read_excel_columns(file, skip_rows=0, sheet=None):
+    """Stream the wanted columns of a sheet; returns ``(frame, total_rows)``.
+
+    The sheet XML is parsed incrementally and only cells in the wanted
+    columns are converted; for the first ``skip_rows`` data rows nothing is
+    converted at all (they still have to be parsed, .xlsx has no row index).
+    Rows without a value in any wanted column (styled blank rows, notes in
+    other columns) are not data rows, whether skipped or read.
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+    row_tag = f"{_NS}row"
+    wanted = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    with zipfile.ZipFile(file) as archive:
+        shared = _shared_strings(archive)
+        picks = None  # column letters -> column name, from the header row
+        total = kept = 0
+        with archive.open(_sheet_path(archive, sheet)) as xml:
+            for _, element in ET.iterparse(xml):
+                if element.tag != row_tag:
+                    continue
+                if picks is not None and total < skip_rows:
+                    # ✅ Same rule as below, so skipped and read rows are numbered alike
+                    if any(_cell_column(cell, position) in picks and _has_value(cell)
+                           for position, cell in enumerate(element)):
+                        total += 1
+                    element.clear()
+                    continue
+
+                values = {}
+                for position, cell in enumerate(element):
+                    column = _cell_column(cell, position)
+                    if picks is None or column in picks:
+                        value = _cell_value(cell, shared)
+                        if value is not None:
+                            values[column] = value
+                element.clear()
+
+                if picks is None:
+                    names = {str(value).strip(): column for column, value in values.items()}
+                    picks = {names[name]: name for name in wanted if name in names}
+                    columns = {name: [] for name in picks.values()}
+                    continue
+                if not values:
+                    continue  # ✅ Formatting-only rows, common at the end of edited sheets
+                for column, name in picks.items():
+                    columns[name].append(values.get(column))
+                kept += 1
+                total += 1
+
+    if picks is None:
+        return pd.DataFrame(columns=REQUIRED_COLUMNS), 0
+    return pd.DataFrame(columns, index=pd.RangeIndex(skip_rows, skip_rows + kept)), total
+
+
+def read_table(path):
+    """Read a whole .xlsx, .csv or .parquet file through the fast path and validate it."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        data = pd.read_parquet(path)
+    elif extension == ".csv":
+        data = pd.read_csv(path, dtype={"type": str}, usecols=lambda col: col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+    else:
+        data, _ = read_excel_columns(path)
+    return validate_frame(data)
+
+
+class RejectLog:
+    """Appends rejected rows, with their source and time, to a CSV report."""
+
+    def __init__(self, path="ingest_rejects.csv"):
+        self.path = path
+        self.rejected = 0
+
+    def write(self, rejects, source):
+        if rejects.empty:
+            return
+        report = rejects.reindex(columns=REJECT_COLUMNS).assign(source=source,
+                                                                rejected_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        report.to_csv(self.path, mode="a", header=not os.path.exists(self.path), index=False)
+        self.rejected += len(rejects)
+
+
+def convert(src, dst, rejects_path=None):
+    """Convert a sheet or table to .csv or .parquet with fixed dtypes; returns the IngestResult."""
+    result = read_table(src)
+    if dst.endswith(".parquet"):
+        result.data.to_parquet(dst, index=False)
+    else:
+        result.data.to_csv(dst, index=False)
+    if rejects_path and not result.rejects.empty:
+        result.rejects.to_csv(rejects_path, index=False)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src", help=".xlsx, .csv or .parquet input")
+    parser.add_argument("dst", help=".csv or .parquet output")
+    parser.add_argument("--rejects", help="CSV report of rejected rows (default: <dst>.rejects.csv)")
+    args = parser.parse_args()
+
+    rejects_path = args.rejects or os.path.splitext(args.dst)[0] + ".rejects.csv"
+    start = time.perf_counter()
+    result = convert(args.src, args.dst, rejects_path)
+    if result.missing_columns:
+        parser.error(f"missing required columns: {', '.join(result.missing_columns)}")
+    print(f"✅ {len(result.data):,} rows written to {args.dst} in {time.perf_counter() - start:.1f} s, "
+          f"{len(result.rejects):,} rejected" + (f" (see {rejects_path})" if len(result.rejects) else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Opt-in per-stage counters and latency histograms for the scoring hot path.
+
+Enable with the environment variable FRAUD_INSTRUMENT=1 before the app,
+service or engine starts. When it is off, ``timed()`` returns a shared no-op
+context manager and nothing is recorded.
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("FRAUD_INSTRUMENT", "") not in ("", "0")
+
+# ✅ Upper bounds of the latency buckets, in milliseconds (the last bucket is open)
+BUCKETS_MS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class StageStats:
+    """Calls, rows, total time and a latency histogram for one stage."""
+
+    __slots__ = ("calls", "rows", "seconds", "max_seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.rows += rows
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def quantile_ms(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (the max for the open bucket)."""
+        target = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_seconds * 1000
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.seconds * 1000, 3),
+            "mean_ms": round(self.seconds * 1000 / self.calls, 4) if self.calls else 0.0,
+            "p50_ms": self.quantile_ms(0.5),
+            "p95_ms": self.quantile_ms(0.95),
+            "p99_ms": self.quantile_ms(0.99),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "histogram": dict(zip([f"<={bound}ms" for bound in BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+
+_stages = {}
+_lock = threading.Lock()
+
+
+def record(stage, seconds, rows=1):
+    """Add one timing to ``stage``; a no-op unless instrumentation is enabled."""
+    if not ENABLED:
+        return
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.add(seconds, rows)
+
+
+class _Timer:
+    __slots__ = ("stage", "rows", "start")
+
+    def __init__(self, stage, rows):
+        self.stage = stage
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.start, self.rows)
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def timed(stage, rows=1):
+    """``with timed("score.encode", rows=len(data)):`` times the block when instrumentation is on."""
+    return _Timer(stage, rows) if ENABLED else _NOOP
+
+
+def enable(on=True):
+    """Switch instrumentation on or off at runtime (benchmarks do this instead of setting the variable)."""
+    global ENABLED
+    ENABLED = on
+
+
+def snapshot():
+    """Summary of every stage recorded so far, keyed by stage name."""
+    with _lock:
+        return {stage: stats.summary() for stage, stats in sorted(_stages.items())}
+
+
+def reset():
+    with _lock:
+        _stages.clear()
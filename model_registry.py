@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+
+from features import FeatureEncoder
+from scoring import predict_fraud_proba
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lightgbm_model.pkl")
+
+# ✅ A typical transaction used to warm up a freshly loaded booster
+WARM_UP_TRANSACTION = {"type": "TRANSFER", "amount": 181.0, "oldbalanceOrg": 181.0, "newbalanceOrig": 0.0,
+                       "oldbalanceDest": 0.0, "newbalanceDest": 0.0}
+
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 of a file, or of every file in a folder artifact, read in 1 MB blocks."""
+    paths = [os.path.join(path, name) for name in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    digest = hashlib.sha256()
+    for file_path in paths:
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _watched_file(path):
+    """File whose mtime signals a new artifact; exported forests write meta.json last."""
+    return os.path.join(path, "meta.json") if os.path.isdir(path) else path
+
+
+def read_artifact(path):
+    """Return ``(model, feature_names)`` from a .pkl artifact or an exported forest folder."""
+    if os.path.isdir(path):
+        from tree_export import load_forest  # ✅ numpy only, lightgbm is never imported
+
+        forest = load_forest(path)
+        return forest, forest.feature_names
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def read_version(path):
+    """Version recorded by train.py in the ``.json`` next to a model artifact, if any."""
+    metadata_path = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(metadata_path):
+        return None
+    with open(metadata_path) as file:
+        return json.load(file).get("version")
+
+
+@dataclass
+class LoadedModel:
+    model: object
+    feature_names: list
+    encoder: FeatureEncoder
+    path: str
+    checksum: str
+    loaded_at: float
+    load_seconds: float
+    version: str = None
+
+
+class ModelRegistry:
+    """Keeps one loaded copy of a model artifact (.pkl or exported forest folder) per process.
+
+    ``get()`` only stats the file (at most every ``check_interval`` seconds);
+    when its mtime changed and the checksum differs, the new model is loaded,
+    warmed up and swapped in.
+    """
+
+    def __init__(self, path=DEFAULT_MODEL_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._current = None
+        self._mtime_ns = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._current is not None and now - self._checked_at < self.check_interval:
+                return self._current
+            self._checked_at = now
+
+            mtime_ns = os.stat(_watched_file(self.path)).st_mtime_ns
+            if self._current is None or mtime_ns != self._mtime_ns:
+                checksum = file_checksum(self.path)
+                if self._current is None or checksum != self._current.checksum:
+                    self._current = self._load(checksum)
+                self._mtime_ns = mtime_ns
+            return self._current
+
+    def _load(self, checksum):
+        start = time.perf_counter()
+        model, feature_names = read_artifact(self.path)
+        encoder = FeatureEncoder(feature_names)
+
+        # ✅ First prediction pays one-off setup costs, do it before any user does
+        predict_fraud_proba(model, encoder.encode_one(WARM_UP_TRANSACTION))
+
+        return LoadedModel(model=model, feature_names=list(feature_names), encoder=encoder, path=self.path,
+                           checksum=checksum, loaded_at=time.time(), load_seconds=time.perf_counter() - start,
+                           version=read_version(self.path) or checksum[:12])
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path=DEFAULT_MODEL_PATH):
+    """Process-wide registry for ``path``; Streamlit reruns reuse it because modules stay imported."""
+    path = os.path.abspath(path)
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = ModelRegistry(path)
+        return _registries[path]
+
+
+def load_model(path=DEFAULT_MODEL_PATH):
+    """Shortcut for ``get_registry(path).get()``."""
+    return get_registry(path).get()
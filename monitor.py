@@ -0,0 +1,429 @@
+"""Background monitoring engine: many transaction sources, one shared batched scorer.
+
+    python monitor.py --file a.csv --file b.xlsx --watch incoming/ --socket 127.0.0.1:9009 --poll-interval 1
+
+Sources run as asyncio tasks on one event loop in a background thread. New
+rows go through a bounded queue (a full queue makes sources wait, so a slow
+scorer throttles reading instead of growing memory) to a single scorer task
+that merges them into one booster call per batch (types the rule pre-filter
+in decision.py clears never reach the booster). Results are pushed to
+subscribers, e.g. Streamlit sessions, which only render them. When the model
+has a reference profile (drift.py), every scored batch also feeds the drift
+histograms; ``drift_report()`` returns the current signal.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from decision import get_decision_engine
+from drift import format_report, get_drift_monitor
+from ingest import RejectLog, validate_frame
+from model_registry import DEFAULT_MODEL_PATH, get_registry
+from sources import open_tail
+
+
+@dataclass
+class ScoredBatch:
+    source: str
+    data: pd.DataFrame
+    prob_fraud: np.ndarray = None
+    labels: np.ndarray = None
+    model_version: str = None
+    received_at: float = 0.0  # time.time() when the rows were read from the source
+    scored_at: float = 0.0
+    error: str = None
+    block: np.ndarray = None  # decision from thresholds.json
+
+
+class TailSource:
+    """Polls one file (or uploaded file) through a tail reader from sources.py."""
+
+    def __init__(self, tail, name, poll_interval=5.0):
+        self.tail = tail
+        self.name = name
+        self.poll_interval = poll_interval
+
+    async def run(self, engine):
+        while True:
+            try:
+                data = await asyncio.to_thread(self.tail.read_new)
+                if not self.tail.rejects.empty:
+                    engine.publish(engine.quarantine(self.name, self.tail.rejects, time.time()))
+                if not data.empty:
+                    await engine.put(self.name, data)
+            except Exception as e:
+                engine.publish(ScoredBatch(self.name, pd.DataFrame(), error=str(e), received_at=time.time()))
+            await asyncio.sleep(self.poll_interval)
+
+
+class DirectorySource:
+    """Polls every file matching ``pattern`` in a folder, including files that appear later."""
+
+    def __init__(self, path, pattern="*", poll_interval=5.0):
+        self.path = path
+        self.pattern = pattern
+        self.name = f"dir:{os.path.abspath(path)}"
+        self.poll_interval = poll_interval
+        self.tails = {}
+
+    async def run(self, engine):
+        while True:
+            for file_path in sorted(glob.glob(os.path.join(self.path, self.pattern))):
+                if file_path not in self.tails:
+                    self.tails[file_path] = open_tail(file_path)
+                try:
+                    data = await asyncio.to_thread(self.tails[file_path].read_new)
+                    if not self.tails[file_path].rejects.empty:
+                        engine.publish(engine.quarantine(self.name, self.tails[file_path].rejects, time.time()))
+                    if not data.empty:
+                        await engine.put(self.name, data)
+                except Exception as e:
+                    engine.publish(ScoredBatch(self.name, pd.DataFrame(), received_at=time.time(),
+                                               error=f"{os.path.basename(file_path)}: {e}"))
+            await asyncio.sleep(self.poll_interval)
+
+
+class SocketSource:
+    """Listens on a TCP port for newline-delimited JSON transactions.
+
+    Lines that arrive together (up to ``max_rows``, or within ``flush_ms`` of
+    each other) are handed to the scorer as one frame.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9009, max_rows=1024, flush_ms=5.0):
+        self.host = host
+        self.port = port
+        self.name = f"socket:{host}:{port}"
+        self.max_rows = max_rows
+        self.flush = flush_ms / 1000.0
+
+    async def run(self, engine):
+        server = await asyncio.start_server(lambda r, w: self._handle(engine, r, w), self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, engine, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                records = [line]
+                while len(records) < self.max_rows:
+                    try:
+                        line = await asyncio.wait_for(reader.readline(), self.flush)
+                    except asyncio.TimeoutError:
+                        break
+                    if not line:
+                        break
+                    records.append(line)
+                await self._put_records(engine, records)
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # ✅ Client went away or the engine is stopping; the connection task just ends
+        finally:
+            writer.close()
+
+    async def _put_records(self, engine, lines):
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                engine.publish(ScoredBatch(self.name, pd.DataFrame(), error=f"invalid JSON line: {e}",
+                                           received_at=time.time()))
+        if records:
+            await engine.put(self.name, pd.DataFrame.from_records(records))
+
+
+class Subscription:
+    """Scored batches for one consumer; when it falls behind, the oldest batches are dropped."""
+
+    def __init__(self, sources=None, max_batches=256):
+        self.sources = set(sources) if sources is not None else None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_batches)
+
+    def _offer(self, batch):
+        if self.sources is not None and batch.source not in self.sources:
+            return
+        while True:
+            try:
+                self._queue.put_nowait(batch)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Wait up to ``timeout`` seconds for results; returns every batch available (maybe none)."""
+        try:
+            batches = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batches.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batches
+
+
+class MonitorEngine:
+    """Runs sources and the shared scorer on a background event loop.
+
+    A batch is closed when it holds ``max_batch_rows`` rows or ``max_wait_ms``
+    has passed since its first frame arrived. At most ``max_pending`` frames
+    wait for the scorer before sources are made to wait.
+    """
+
+    def __init__(self, registry, max_batch_rows=8192, max_wait_ms=50.0, max_pending=64, store=None,
+                 feature_store=None, reject_log=None):
+        self.registry = registry
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+        self.store = store
+        self.feature_store = feature_store
+        self.reject_log = reject_log
+        self.stats = {"rows_in": 0, "rows_scored": 0, "rows_skipped_model": 0, "rows_rejected": 0, "batches": 0,
+                      "errors": 0}
+
+        self._sources = {}  # name -> [source, task, reference count]
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+
+    def start(self):
+        self.registry.get()  # ✅ Load the model before the first rows arrive, not on their latency
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="monitor-engine", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def drift_report(self):
+        """PSI/KS drift signal of the scored rows, or None when the model has no reference profile."""
+        drift = get_drift_monitor(self.registry.path)
+        return drift.report() if drift is not None else None
+
+    def add_source(self, source):
+        """Start polling ``source`` (thread-safe); adding a source with a known name only counts a reference."""
+        return asyncio.run_coroutine_threadsafe(self._add_source(source), self._loop).result()
+
+    def remove_source(self, name):
+        """Drop one reference to a source; it stops when no subscriber needs it any more."""
+        asyncio.run_coroutine_threadsafe(self._remove_source(name), self._loop).result()
+
+    def subscribe(self, sources=None, max_batches=256):
+        subscription = Subscription(sources, max_batches)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, batch):
+        if batch.error is not None:
+            self.stats["errors"] += 1
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription._offer(batch)
+
+    def quarantine(self, source, rejects, received_at):
+        """Count and report malformed rows (or unparseable lines); returns the error batch for the feed."""
+        self.stats["rows_rejected"] += len(rejects)
+        if self.reject_log is not None:
+            self.reject_log.write(rejects, source)
+        reasons = ", ".join(rejects["reject_reason"].unique()[:3])
+        return ScoredBatch(source, rejects, received_at=received_at,
+                           error=f"{len(rejects)} malformed rows quarantined ({reasons})")
+
+    async def put(self, source_name, data):
+        """Called by sources; waits while ``max_pending`` frames are already queued."""
+        self.stats["rows_in"] += len(data)
+        await self._queue.put((source_name, data, time.time()))
+
+    def _run_loop(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._loop.create_task(self._score_forever())
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    async def _cancel_tasks(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._sources.clear()
+
+    async def _add_source(self, source):
+        entry = self._sources.get(source.name)
+        if entry is None:
+            self._sources[source.name] = [source, asyncio.get_running_loop().create_task(source.run(self)), 1]
+        else:
+            entry[2] += 1
+        return source.name
+
+    async def _remove_source(self, name):
+        entry = self._sources.get(name)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            entry[1].cancel()
+            del self._sources[name]
+
+    async def _score_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            rows = len(items[0][1])
+            deadline = loop.time() + self.max_wait
+
+            while rows < self.max_batch_rows:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                rows += len(item[1])
+
+            # ⚡ The booster call runs in a worker thread so sources keep reading meanwhile
+            for batch in await loop.run_in_executor(None, self._score_items, items):
+                if batch.error is None:
+                    instrumentation.record("monitor.read_to_scored", batch.scored_at - batch.received_at, len(batch.data))
+                self.publish(batch)
+
+    def _score_items(self, items):
+        results, valid = [], []
+        for source, data, received_at in items:
+            checked = validate_frame(data)
+            if checked.missing_columns:
+                results.append(ScoredBatch(source, data, received_at=received_at,
+                                           error=f"missing required columns: {', '.join(checked.missing_columns)}"))
+                continue
+            # ✅ Malformed rows are quarantined, the rest of the frame is still scored
+            if len(checked.rejects):
+                results.append(self.quarantine(source, checked.rejects, received_at))
+            if len(checked.data):
+                valid.append((source, checked.data, received_at))
+        if not valid:
+            return results
+
+        try:
+            loaded = self.registry.get()
+            # ✅ Every column the encoder reads (``step`` too when a source carries it), as batch_score.py scores
+            frames = [data[["type"] + [name for name, _ in loaded.encoder.numeric_slots if name in data]]
+                      for _, data, _ in valid]
+            # ✅ A source without ``step`` scores it as 0, also when merged with one that has it
+            merged = pd.concat(frames, ignore_index=True).fillna(0)
+            decisions = get_decision_engine().decide(loaded.model, loaded.encoder, merged)
+            if self.store is not None:
+                self.store.append(merged, decisions.prob_fraud, loaded.version)
+            drift = get_drift_monitor(self.registry.path)
+            if drift is not None:
+                drift.update(merged, decisions.prob_fraud, decisions.type_codes)
+        except Exception as e:
+            return results + [ScoredBatch(source, data, received_at=received_at, error=str(e))
+                              for source, data, received_at in valid]
+
+        scored_at = time.time()
+        start = 0
+        for source, data, received_at in valid:
+            stop = start + len(data)
+            # ✅ Per-account velocity (shown with each transaction) when account ids are present
+            if self.feature_store is not None and {"nameOrig", "nameDest"}.issubset(data.columns):
+                data = data.join(self.feature_store.update_frame(data))
+            results.append(ScoredBatch(source, data, decisions.prob_fraud[start:stop], decisions.labels[start:stop],
+                                       loaded.version, received_at, scored_at, block=decisions.block[start:stop]))
+            start = stop
+        self.stats["rows_scored"] += len(merged)
+        self.stats["rows_skipped_model"] += int(np.count_nonzero(~decisions.scored))
+        self.stats["batches"] += 1
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", action="append", default=[], help="file to tail (.xlsx, .csv, .jsonl); repeatable")
+    parser.add_argument("--watch", action="append", default=[], help="folder of incoming files; repeatable")
+    parser.add_argument("--pattern", default="*", help="file pattern inside watched folders")
+    parser.add_argument("--socket", action="append", default=[], help="HOST:PORT to accept JSON lines on; repeatable")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="seconds between file/folder polls")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--rejects", default="ingest_rejects.csv", help="CSV report of quarantined rows")
+    args = parser.parse_args()
+
+    engine = MonitorEngine(get_registry(args.model), reject_log=RejectLog(args.rejects)).start()
+    subscription = engine.subscribe()
+    for path in args.file:
+        engine.add_source(TailSource(open_tail(path), path, args.poll_interval))
+    for path in args.watch:
+        engine.add_source(DirectorySource(path, args.pattern, args.poll_interval))
+    for address in args.socket:
+        host, port = address.rsplit(":", 1)
+        engine.add_source(SocketSource(host, int(port)))
+
+    print("✅ Monitoring started, press Ctrl+C to stop")
+    drift_status = None
+    try:
+        while True:
+            report = engine.drift_report()
+            if report is not None and report["status"] != drift_status:
+                drift_status = report["status"]  # ✅ Printed when the status changes, not on every batch
+                print(("⚠ " if report["drifted"] else "") + format_report(report))
+            for batch in subscription.get(timeout=1.0):
+                if batch.error is not None:
+                    print(f"⚠ {batch.source}: {batch.error}")
+                    continue
+                flagged = np.flatnonzero(batch.block)  # ✅ Blocked according to thresholds.json
+                latency_ms = (batch.scored_at - batch.received_at) * 1000
+                print(f"{batch.source}: {len(batch.data)} rows, {len(flagged)} flagged, {latency_ms:.1f} ms")
+                for i in flagged:
+                    print(f"  🚨 {batch.data.iloc[i].to_dict()}  prob_fraud={batch.prob_fraud[i]:.3f}")
+    except KeyboardInterrupt:
+        engine.stop()
+        if instrumentation.ENABLED:
+            print(json.dumps(instrumentation.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Fixed-size monitoring view for the Streamlit apps.
+
+MonitorFeed keeps the last N scored rows and alerts in ring buffers plus
+running counters, so memory does not grow with the length of a session.
+MonitorView renders it into placeholders created once and overwritten in
+place, at most once per ``refresh_seconds``.
+"""
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+
+FEED_COLUMNS = ["type", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+
+
+class MonitorFeed:
+    """Ring buffers of recent rows, alerts and errors, and counters over the whole session."""
+
+    def __init__(self, capacity=200, alert_capacity=50, rate_window=10.0):
+        self.recent = deque(maxlen=capacity)
+        self.alerts = deque(maxlen=alert_capacity)
+        self.errors = deque(maxlen=5)
+        self.rate_window = rate_window
+        self.rows_total = 0
+        self.flagged_total = 0
+        self._arrivals = deque()  # (monotonic time, rows) inside rate_window
+
+    def add(self, batch, flagged, reasons=()):
+        """Record a ScoredBatch; ``flagged`` is a boolean mask, ``reasons`` the top factors of flagged rows."""
+        n = len(batch.data)
+        self.rows_total += n
+        self.flagged_total += int(np.count_nonzero(flagged))
+        now = time.monotonic()
+        self._arrivals.append((now, n))
+        self._prune(now)
+
+        # ✅ Only the rows that can still be visible are converted
+        keep = slice(max(n - self.recent.maxlen, 0), n)
+        columns = [col for col in FEED_COLUMNS if col in batch.data.columns]
+        rows = batch.data.iloc[keep][columns].to_dict("records")
+        for row, prob_fraud, is_flagged in zip(rows, batch.prob_fraud[keep], flagged[keep]):
+            row.update(source=batch.source, prob_fraud=round(float(prob_fraud), 4),
+                       verdict="🚨 Fraud" if is_flagged else "✅ Legitimate")
+            self.recent.appendleft(row)
+
+        flagged_rows = np.flatnonzero(flagged)[-self.alerts.maxlen:]
+        reasons = list(reasons)[-len(flagged_rows):] if len(flagged_rows) else []
+        records = batch.data.iloc[flagged_rows][columns].to_dict("records")
+        for i, (row, index) in enumerate(zip(records, flagged_rows)):
+            row.update(source=batch.source, prob_fraud=round(float(batch.prob_fraud[index]), 4),
+                       top_factors=", ".join(name for name, _ in reasons[i]) if i < len(reasons) else "")
+            self.alerts.appendleft(row)
+
+    def add_error(self, source, message):
+        self.errors.appendleft(f"{source}: {message}")
+
+    @property
+    def rows_per_second(self):
+        now = time.monotonic()
+        self._prune(now)
+        return sum(n for _, n in self._arrivals) / self.rate_window
+
+    @property
+    def fraud_rate(self):
+        return self.flagged_total / self.rows_total if self.rows_total else 0.0
+
+    def _prune(self, now):
+        while self._arrivals and now - self._arrivals[0][0] > self.rate_window:
+            self._arrivals.popleft()
+
+
+class MonitorView:
+    """Placeholders for counters, alerts and recent rows, redrawn in place."""
+
+    def __init__(self, feed, refresh_seconds=1.0):
+        self.feed = feed
+        self.refresh_seconds = refresh_seconds
+        self._rendered_at = 0.0
+        self.metrics = st.empty()
+        self.errors = st.empty()
+        self.drift = st.empty()
+        st.subheader("🚨 Recent Alerts")
+        self.alerts = st.empty()
+        st.subheader("📊 Latest Transactions Being Monitored:")
+        self.recent = st.empty()
+        self.stages = st.expander("⏱ Stage timings").empty() if instrumentation.ENABLED else None
+
+    def refresh(self, queue_depth=0, dropped=0, drift=None, force=False):
+        """Redraw everything, unless the last redraw was less than ``refresh_seconds`` ago.
+
+        ``drift`` is a DriftMonitor report; drifted signals are shown as a warning.
+        """
+        now = time.monotonic()
+        if not force and now - self._rendered_at < self.refresh_seconds:
+            return
+        self._rendered_at = now
+        feed = self.feed
+
+        with self.metrics.container():
+            columns = st.columns(5)
+            columns[0].metric("Rows/sec", f"{feed.rows_per_second:,.1f}")
+            columns[1].metric("Rows scored", f"{feed.rows_total:,}")
+            columns[2].metric("Fraud rate", f"{feed.fraud_rate:.2%}")
+            columns[3].metric("Queue depth", queue_depth)
+            columns[4].metric("Dropped batches", dropped)
+
+        if feed.errors:
+            self.errors.error("⚠ " + "\n\n⚠ ".join(feed.errors))
+        else:
+            self.errors.empty()
+        if drift is not None and drift["drifted"]:
+            details = ", ".join(f"{name} (PSI {drift['signals'][name]['psi']:.2f})" for name in drift["drifted"])
+            self.drift.warning(f"📉 Data drift ({drift['status']}) over the last {drift['rows']:,} rows: {details}")
+        else:
+            self.drift.empty()
+        self.alerts.dataframe(pd.DataFrame(list(feed.alerts)), hide_index=True, use_container_width=True)
+        self.recent.dataframe(pd.DataFrame(list(feed.recent)), hide_index=True, use_container_width=True)
+        if self.stages is not None:
+            stages = pd.DataFrame.from_dict(instrumentation.snapshot(), orient="index")
+            self.stages.dataframe(stages.drop(columns="histogram", errors="ignore"), use_container_width=True)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from instrumentation import timed
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def predict_fraud_proba(model, matrix):
+    """Return the probability of fraud (class 1) for every row of ``matrix``."""
+    booster = getattr(model, "booster_", None)
+    if booster is not None:
+        # Skip the sklearn wrapper: the booster returns P(fraud) directly for binary models
+        return booster.predict(matrix)
+    return model.predict_proba(matrix)[:, 1]
+
+
+def labels_from_proba(model, prob_fraud):
+    """Turn fraud probabilities into the labels ``model.predict`` would return."""
+    classes = np.asarray(getattr(model, "classes_", [0, 1]))
+    return classes[(np.asarray(prob_fraud) > 0.5).astype(np.intp)]
+
+
+def score_batch(model, encoder, data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score a frame of transactions, calling the booster once per chunk.
+
+    ``encoder`` is the FeatureEncoder built from the model's feature names.
+    Returns ``(prob_fraud, labels)`` arrays aligned with the rows of ``data``.
+    """
+    with timed("score.encode", rows=len(data)):
+        matrix = encoder.encode_frame(data)
+    prob_fraud = np.empty(len(matrix), dtype=np.float64)
+
+    with timed("score.predict", rows=len(matrix)):
+        for start in range(0, len(matrix), chunk_size):
+            stop = start + chunk_size
+            prob_fraud[start:stop] = predict_fraud_proba(model, matrix[start:stop])
+
+    return prob_fraud, labels_from_proba(model, prob_fraud)
@@ -0,0 +1,215 @@
+"""Headless HTTP/JSON fraud scoring service.
+
+    python scoring_service.py --port 8000 --max-batch-rows 256 --max-wait-ms 2
+
+POST /score with one transaction object or an array of them (the six
+REQUIRED_COLUMNS fields). Concurrent requests are collected into micro-batches
+and scored with one booster call per batch; "block" applies the per-type
+thresholds in thresholds.json, and rule-cleared types skip the booster.
+GET /metrics returns per-stage timings when started with FRAUD_INSTRUMENT=1.
+GET /drift returns the PSI/KS drift signal of the scored traffic against the
+model's reference profile (drift.py), when the model has one.
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import instrumentation
+from features import REQUIRED_COLUMNS, TRANSACTION_TYPES
+from model_registry import DEFAULT_MODEL_PATH, get_registry
+from decision import get_decision_engine
+from drift import get_drift_monitor
+
+
+def validate_transaction(record):
+    """Raise ValueError if ``record`` does not follow the six-field transaction schema."""
+    if not isinstance(record, dict):
+        raise ValueError("each transaction must be a JSON object")
+    missing = [col for col in REQUIRED_COLUMNS if col not in record]
+    if missing:
+        raise ValueError(f"missing required fields: {', '.join(missing)}")
+    if record["type"] not in TRANSACTION_TYPES:
+        raise ValueError(f"unknown transaction type: {record['type']!r}")
+    # ✅ ``step`` is optional, but one bad value would fail the whole micro-batch, so it is checked too
+    for col in REQUIRED_COLUMNS[1:] + [col for col in ("step",) if col in record]:
+        value = record[col]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{col} must be a finite number")
+
+
+class _Pending:
+    """One request waiting in the batch queue."""
+
+    __slots__ = ("records", "done", "prob_fraud", "labels", "block", "error")
+
+    def __init__(self, records):
+        self.records = records
+        self.done = threading.Event()
+        self.prob_fraud = None
+        self.labels = None
+        self.block = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Collects concurrent scoring requests and sends them to the booster together.
+
+    A batch is closed when it holds ``max_batch_rows`` rows or ``max_wait_ms``
+    has passed since its first request arrived, whichever comes first.
+    """
+
+    def __init__(self, registry, max_batch_rows=256, max_wait_ms=2.0, max_queue=10_000):
+        self.registry = registry
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def score(self, records, timeout=10.0):
+        """Score a list of transaction dicts; returns ``(prob_fraud, labels, block)``."""
+        pending = _Pending(records)
+        self._queue.put(pending, timeout=timeout)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("scoring timed out")
+        if pending.error is not None:
+            raise pending.error
+        return pending.prob_fraud, pending.labels, pending.block
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0].records)
+            deadline = time.monotonic() + self.max_wait
+
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(pending)
+                rows += len(pending.records)
+
+            self._score_batch(batch)
+
+    def _score_batch(self, batch):
+        try:
+            loaded = self.registry.get()
+            records = [record for pending in batch for record in pending.records]
+            with instrumentation.timed("service.decide", rows=len(records)):
+                decisions = get_decision_engine().decide_records(loaded.model, loaded.encoder, records)
+            drift = get_drift_monitor(self.registry.path)
+            if drift is not None:
+                drift.update_records(records, decisions.prob_fraud, decisions.type_codes)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            return
+
+        start = 0
+        for pending in batch:
+            stop = start + len(pending.records)
+            pending.prob_fraud = decisions.prob_fraud[start:stop]
+            pending.labels = decisions.labels[start:stop]
+            pending.block = decisions.block[start:stop]
+            pending.done.set()
+            start = stop
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes; don't wait for delayed ACKs
+    batcher = None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, {"enabled": instrumentation.ENABLED, "stages": instrumentation.snapshot()})
+            return
+        if self.path == "/drift":
+            drift = get_drift_monitor(self.batcher.registry.path)
+            if drift is None:
+                self._send_json(404, {"error": "the model has no reference profile, see drift.py"})
+            else:
+                self._send_json(200, drift.report())
+            return
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        loaded = self.batcher.registry.get()
+        self._send_json(200, {"status": "ok", "model_checksum": loaded.checksum})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length))
+            single = isinstance(body, dict)
+            records = [body] if single else body
+            if not isinstance(records, list) or not records:
+                raise ValueError("expected a transaction object or a non-empty array of them")
+            for record in records:
+                validate_transaction(record)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            with instrumentation.timed("service.request", rows=len(records)):
+                prob_fraud, labels, block = self.batcher.score(records)
+        except Exception as e:
+            self._send_json(503, {"error": str(e)})
+            return
+
+        results = [{"prob_fraud": float(p), "is_fraud": int(label), "block": bool(b)}
+                   for p, label, b in zip(prob_fraud, labels, block)]
+        self._send_json(200, results[0] if single else results)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # ✅ Per-request logging would dominate the latency we are measuring
+
+
+def make_server(host="127.0.0.1", port=8000, model_path=DEFAULT_MODEL_PATH, max_batch_rows=256, max_wait_ms=2.0):
+    """Build the HTTP server; call ``serve_forever()`` on the result to start it."""
+    batcher = MicroBatcher(get_registry(model_path), max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms)
+    handler = type("BoundScoringHandler", (ScoringHandler,), {"batcher": batcher})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--max-batch-rows", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.model, args.max_batch_rows, args.max_wait_ms)
+    print(f"✅ Scoring service listening on http://{args.host}:{args.port}/score")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
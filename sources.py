@@ -0,0 +1,172 @@
+import io
+import json
+import os
+
+import pandas as pd
+
+from ingest import read_excel_columns
+
+
+def _row_hash(data, position):
+    """Content hash of one row, used to notice a sheet that was rewritten in place.
+
+    Values are hashed as text, so the result does not depend on the dtype the
+    column got in this particular read.
+    """
+    return hash(tuple(str(value) for value in data.iloc[position].tolist()))
+
+
+def _line_rejects(lines, reasons):
+    """Lines that could not be parsed, as a frame for the reject report."""
+    return pd.DataFrame({"line": lines, "reject_reason": reasons}, dtype=object)
+
+
+class ExcelTail:
+    """Returns only the spreadsheet rows that were not scored yet.
+
+    Excel files cannot be read from a byte offset, so the sheet is still parsed
+    (streamed, read-only, only the columns the model needs), but no values are
+    built for rows before the last one seen. If the sheet shrinks or the last
+    seen row changed, it is treated as a new file and read from the top.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.rows_seen = 0
+        self.last_row_hash = None
+        self.rejects = _line_rejects([], [])  # ✅ Sheets always parse; bad values are caught by validate_frame
+
+    def read_new(self):
+        skip = max(self.rows_seen - 1, 0)  # ✅ Re-read the last seen row to notice a rewritten sheet
+        data, total = read_excel_columns(self.file, skip_rows=skip)
+
+        if self.rows_seen:
+            rewritten = total < self.rows_seen or _row_hash(data, 0) != self.last_row_hash
+            if rewritten:
+                self.rows_seen = skip = 0
+                data, total = read_excel_columns(self.file)
+
+        new_rows = data.iloc[self.rows_seen - skip:]
+        if len(new_rows):
+            self.rows_seen = total
+            self.last_row_hash = _row_hash(data, len(data) - 1)
+        return new_rows
+
+
+class _ByteOffsetTail:
+    """Reads a text file from the byte offset where the previous read stopped.
+
+    Only complete lines are consumed; a half-written last line is left for the
+    next read. A file that became shorter than the offset is read again from
+    the start. Lines that cannot be parsed are left out of the result and kept
+    in ``rejects`` until the next read; the offset only moves past a chunk once
+    it was parsed, so a failed read loses nothing.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = 0
+        self.rejects = _line_rejects([], [])
+
+    def _size(self):
+        if isinstance(self.file, (str, os.PathLike)):
+            return os.path.getsize(self.file)
+        self.file.seek(0, io.SEEK_END)
+        return self.file.tell()
+
+    def _read_from(self, offset):
+        if isinstance(self.file, (str, os.PathLike)):
+            with open(self.file, "rb") as f:
+                f.seek(offset)
+                return f.read()
+        self.file.seek(offset)
+        return self.file.read()
+
+    def read_new(self):
+        if self._size() < self.offset:
+            self.reset()
+
+        chunk = self._read_from(self.offset)
+        end = chunk.rfind(b"\n")
+        chunk = chunk[:end + 1]  # ✅ Empty when no line is complete yet
+        data, self.rejects = self._parse(chunk)
+        self.offset += len(chunk)
+        return data
+
+    def reset(self):
+        self.offset = 0
+
+    def _parse(self, chunk):
+        """Return ``(frame, rejects)`` for a chunk of complete lines."""
+        raise NotImplementedError
+
+
+class CsvTail(_ByteOffsetTail):
+    """Tails a CSV file; the header line is kept and reused for every new chunk."""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.header = None
+
+    def reset(self):
+        super().reset()
+        self.header = None
+
+    def _parse(self, chunk):
+        header = self.header
+        if header is None:
+            if not chunk:
+                return pd.DataFrame(), _line_rejects([], [])
+            header_end = chunk.find(b"\n") + 1
+            header, chunk = chunk[:header_end], chunk[header_end:]
+        try:
+            data, rejects = pd.read_csv(io.BytesIO(header + chunk)), _line_rejects([], [])
+        except pd.errors.ParserError:
+            # ✅ Only chunks with a ragged row take the slower python engine, which hands bad lines back
+            bad = []
+            data = pd.read_csv(io.BytesIO(header + chunk), engine="python", on_bad_lines=bad.append)
+            rejects = _line_rejects([",".join(fields) for fields in bad],
+                                    [f"{len(fields)} fields, header has {len(data.columns)}" for fields in bad])
+        self.header = header  # ✅ Kept only once the chunk was parsed, so a failed read starts over cleanly
+        return data, rejects
+
+
+class JsonLinesTail(_ByteOffsetTail):
+    """Tails a newline-delimited JSON file with one transaction object per line."""
+
+    def _parse(self, chunk):
+        records, bad_lines, reasons = [], [], []
+        for line in chunk.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record, reason = None, f"invalid JSON: {e}"
+            else:
+                reason = "not a JSON object"
+            if isinstance(record, dict):
+                records.append(record)
+            else:
+                bad_lines.append(line.decode("utf-8", "replace"))
+                reasons.append(reason)
+        return pd.DataFrame.from_records(records), _line_rejects(bad_lines, reasons)
+
+
+def open_tail(file, name=None):
+    """Pick the tail reader that matches the file extension (.xlsx, .csv, .jsonl/.ndjson)."""
+    name = name or getattr(file, "name", None) or str(file)
+    extension = os.path.splitext(name)[1].lower()
+    if extension in (".csv",):
+        return CsvTail(file)
+    if extension in (".jsonl", ".ndjson"):
+        return JsonLinesTail(file)
+    return ExcelTail(file)
+
+
+def session_tail(session_state, file):
+    """Return the tail reader for ``file`` kept in Streamlit session state, so reruns resume where they stopped."""
+    key = f"tail:{getattr(file, 'file_id', None) or getattr(file, 'name', file)}"
+    if key not in session_state:
+        session_state[key] = open_tail(file)
+    return session_state[key]
@@ -0,0 +1,77 @@
+"""DecisionEngine must score the model types exactly like the model, and clear the rest by rule."""
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_transactions
+from decision import DecisionConfig, DecisionEngine
+from features import FeatureEncoder
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "lightgbm_model.pkl")
+
+
+@pytest.fixture(scope="module")
+def model():
+    with open(MODEL_PATH, "rb") as file:
+        return pickle.load(file)
+
+
+@pytest.fixture(scope="module")
+def data():
+    data = make_transactions(5_000)
+    data.insert(0, "step", np.random.default_rng(0).integers(1, 744, len(data)))
+    return data
+
+
+def test_transfer_and_cash_out_score_like_the_model(model, data):
+    model, feature_names = model
+    encoder = FeatureEncoder(feature_names)
+    engine = DecisionEngine(DecisionConfig(thresholds={"TRANSFER": 0.6, "CASH_OUT": 0.8}))
+    decisions = engine.decide(model, encoder, data)
+
+    for transaction_type, threshold in [("TRANSFER", 0.6), ("CASH_OUT", 0.8)]:
+        rows = (data["type"] == transaction_type).to_numpy()
+        matrix = encoder.encode_frame(data[rows])
+        expected = model.predict_proba(matrix)[:, 1]
+        np.testing.assert_allclose(decisions.prob_fraud[rows], expected, rtol=0, atol=1e-12)
+        assert np.array_equal(decisions.labels[rows], model.predict(matrix))
+        assert np.array_equal(decisions.block[rows], expected > threshold)
+        assert decisions.scored[rows].all()
+
+
+def test_rule_types_skip_the_model(model, data):
+    model, feature_names = model
+    decisions = DecisionEngine().decide(model, FeatureEncoder(feature_names), data)
+
+    skipped = data["type"].isin(["CASH_IN", "DEBIT", "PAYMENT"]).to_numpy()
+    assert not decisions.scored[skipped].any()
+    assert not decisions.prob_fraud[skipped].any()
+    assert not decisions.labels[skipped].any()
+    assert not decisions.block[skipped].any()
+
+
+def test_frame_records_and_single_rows_agree(model, data):
+    model, feature_names = model
+    encoder = FeatureEncoder(feature_names)
+    engine = DecisionEngine()
+    sample = data.head(200)
+
+    from_frame = engine.decide(model, encoder, sample)
+    from_records = engine.decide_records(model, encoder, sample.to_dict("records"))
+    np.testing.assert_allclose(from_records.prob_fraud, from_frame.prob_fraud, rtol=0, atol=1e-12)
+    assert np.array_equal(from_records.block, from_frame.block)
+
+    for i, transaction in enumerate(sample.head(20).to_dict("records")):
+        prob_fraud, label, block = engine.decide_one(model, encoder, transaction)
+        assert prob_fraud == pytest.approx(from_frame.prob_fraud[i], abs=1e-12)
+        assert (label, block) == (from_frame.labels[i], from_frame.block[i])
+
+
+def test_unknown_types_in_the_config_are_rejected(tmp_path):
+    path = tmp_path / "thresholds.json"
+    path.write_text(json.dumps({"types": {"WIRE": 0.5}}))
+    with pytest.raises(ValueError, match="WIRE"):
+        DecisionConfig.load(str(path))
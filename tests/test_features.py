@@ -0,0 +1,49 @@
+"""FeatureEncoder must give exactly the feature values of the get_dummies + padding path it replaced."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import TRANSACTION_TYPES, FeatureEncoder
+from train import TRAINING_FEATURES
+
+
+def encode_with_get_dummies(transaction, feature_names):
+    """The row encoding the "Predict Fraud" button used to do."""
+    user_input = pd.get_dummies(pd.DataFrame([transaction]))
+    for col in feature_names:
+        if col not in user_input.columns:
+            user_input[col] = 0
+    return user_input[feature_names].to_numpy(dtype=np.float64)
+
+
+def transaction(transaction_type, **extra):
+    return {"type": transaction_type, "amount": 181.5, "oldbalanceOrg": 181.5, "newbalanceOrig": 0.0,
+            "oldbalanceDest": 21182.0, "newbalanceDest": 0.0, **extra}
+
+
+CASES = [transaction(t) for t in TRANSACTION_TYPES + ["UNKNOWN"]] + \
+        [transaction(t, step=7) for t in TRANSACTION_TYPES + ["UNKNOWN"]]
+
+
+@pytest.fixture
+def encoder():
+    return FeatureEncoder(TRAINING_FEATURES)
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: f"{case['type']}{'+step' if 'step' in case else ''}")
+def test_encode_one_matches_get_dummies(encoder, case):
+    assert np.array_equal(encoder.encode_one(case), encode_with_get_dummies(case, TRAINING_FEATURES))
+
+
+def test_batch_encoders_match_get_dummies(encoder):
+    expected = np.vstack([encode_with_get_dummies(case, TRAINING_FEATURES) for case in CASES])
+
+    assert np.array_equal(encoder.encode_records(CASES), expected)
+    # ✅ Rows without ``step`` are NaN there once framed; the monitor engine fills them with 0, as here
+    assert np.array_equal(encoder.encode_frame(pd.DataFrame(CASES).fillna({"step": 0})), expected)
+
+
+def test_unknown_type_sets_no_type_slot(encoder):
+    row = encoder.encode_one(transaction("UNKNOWN"))
+    type_slots = [i for i, name in enumerate(TRAINING_FEATURES) if name.startswith("type_")]
+    assert not row[0, type_slots].any()
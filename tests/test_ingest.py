@@ -0,0 +1,97 @@
+"""Regression tests for the streaming .xlsx reader, the Excel tail built on it and the reject report."""
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.styles import Font
+
+from features import REQUIRED_COLUMNS
+from ingest import REJECT_COLUMNS, RejectLog, read_excel_columns, validate_frame
+from sources import ExcelTail, JsonLinesTail
+
+HEADER = ["step"] + REQUIRED_COLUMNS + ["notes"]
+
+
+def transaction(i):
+    return [1, "TRANSFER", 100.0 + i, 100.0 + i, 0.0, 0.0, 0.0]
+
+
+def write_sheet(path, rows):
+    """``rows`` holds transactions, ``"blank"`` (a bold row without values) or ``"note"`` (a notes-only row)."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in rows:
+        if row == "blank":
+            blank_row = sheet.max_row + 1
+            for column in range(1, len(HEADER) + 1):
+                sheet.cell(row=blank_row, column=column).font = Font(bold=True)
+        elif row == "note":
+            sheet.append([None] * len(REQUIRED_COLUMNS) + [None, "checked by ops"])
+        else:
+            sheet.append(row)
+    workbook.save(path)
+
+
+@pytest.fixture
+def sheet_rows():
+    return [transaction(i) for i in range(5)] + ["blank", "note"] + [transaction(i) for i in range(5, 10)]
+
+
+def test_blank_and_note_rows_are_not_data_rows(tmp_path, sheet_rows):
+    path = tmp_path / "tx.xlsx"
+    write_sheet(path, sheet_rows)
+
+    data, total = read_excel_columns(path)
+    assert total == len(data) == 10
+    assert data["amount"].tolist() == [100.0 + i for i in range(10)]
+
+
+@pytest.mark.parametrize("skip_rows", range(11))
+def test_skipped_rows_are_counted_like_read_rows(tmp_path, sheet_rows, skip_rows):
+    path = tmp_path / "tx.xlsx"
+    write_sheet(path, sheet_rows)
+
+    data, total = read_excel_columns(path, skip_rows=skip_rows)
+    assert total == 10
+    assert data["amount"].tolist() == [100.0 + i for i in range(skip_rows, 10)]
+    assert data.index.tolist() == list(range(skip_rows, 10))
+
+
+def test_excel_tail_returns_only_new_rows_past_a_blank_row(tmp_path, sheet_rows):
+    path = tmp_path / "tx.xlsx"
+    write_sheet(path, sheet_rows)
+    tail = ExcelTail(str(path))
+
+    assert len(tail.read_new()) == 10
+    assert len(tail.read_new()) == 0
+
+    write_sheet(path, sheet_rows + [transaction(10), "blank", transaction(11)])
+    assert tail.read_new()["amount"].tolist() == [110.0, 111.0]
+    assert len(tail.read_new()) == 0
+
+
+def test_excel_tail_rereads_a_rewritten_sheet(tmp_path, sheet_rows):
+    path = tmp_path / "tx.xlsx"
+    write_sheet(path, sheet_rows)
+    tail = ExcelTail(str(path))
+    tail.read_new()
+
+    write_sheet(path, [transaction(i) for i in range(20, 23)])
+    assert tail.read_new()["amount"].tolist() == [120.0, 121.0, 122.0]
+
+
+def test_reject_log_lines_up_rows_and_unparseable_lines(tmp_path):
+    source = tmp_path / "tx.jsonl"
+    source.write_text('{"type": "NOPE", "amount": 1, "oldbalanceOrg": 1, "newbalanceOrig": 0, '
+                      '"oldbalanceDest": 0, "newbalanceDest": 0, "isFraud": 0}\n{not json\n')
+    tail = JsonLinesTail(str(source))
+    log = RejectLog(str(tmp_path / "rejects.csv"))
+
+    log.write(validate_frame(tail.read_new()).rejects, "tx")
+    log.write(tail.rejects, "tx")
+
+    report = pd.read_csv(log.path)
+    assert log.rejected == 2
+    assert report.columns.tolist() == REJECT_COLUMNS + ["source", "rejected_at"]
+    assert report["type"].tolist()[0] == "NOPE"
+    assert report["line"].tolist()[1] == "{not json"
@@ -0,0 +1,55 @@
+"""Regression tests for the byte-offset CSV and JSON-lines tails."""
+import json
+
+from features import REQUIRED_COLUMNS
+from sources import CsvTail, JsonLinesTail
+
+
+def transaction(i):
+    return {"type": "TRANSFER", "amount": 100.0 + i, "oldbalanceOrg": 100.0 + i, "newbalanceOrig": 0.0,
+            "oldbalanceDest": 0.0, "newbalanceDest": 0.0}
+
+
+def csv_line(i):
+    return ",".join(str(value) for value in transaction(i).values()) + "\n"
+
+
+def append(path, text):
+    with open(path, "a") as file:
+        file.write(text)
+
+
+def test_csv_tail_keeps_good_rows_around_a_ragged_row(tmp_path):
+    path = tmp_path / "tx.csv"
+    append(path, ",".join(REQUIRED_COLUMNS) + "\n" + csv_line(0))
+    tail = CsvTail(str(path))
+    assert tail.read_new()["amount"].tolist() == [100.0]
+
+    append(path, csv_line(1) + "TRANSFER,1,2,3,4,5,6,7\n" + csv_line(2))
+    assert tail.read_new()["amount"].tolist() == [101.0, 102.0]
+    assert tail.rejects["line"].tolist() == ["TRANSFER,1,2,3,4,5,6,7"]
+
+    append(path, csv_line(3))
+    assert tail.read_new()["amount"].tolist() == [103.0]
+    assert tail.rejects.empty
+
+
+def test_jsonl_tail_keeps_good_rows_around_a_bad_line(tmp_path):
+    path = tmp_path / "tx.jsonl"
+    append(path, json.dumps(transaction(0)) + "\n{not json\n[1, 2]\n" + json.dumps(transaction(1)) + "\n")
+    tail = JsonLinesTail(str(path))
+
+    assert tail.read_new()["amount"].tolist() == [100.0, 101.0]
+    assert tail.rejects["line"].tolist() == ["{not json", "[1, 2]"]
+    assert tail.rejects["reject_reason"].str.startswith(("invalid JSON", "not a JSON object")).all()
+
+
+def test_half_written_line_waits_for_the_next_read(tmp_path):
+    path = tmp_path / "tx.jsonl"
+    line = json.dumps(transaction(0))
+    append(path, line[:10])
+    tail = JsonLinesTail(str(path))
+
+    assert tail.read_new().empty
+    append(path, line[10:] + "\n")
+    assert tail.read_new()["amount"].tolist() == [100.0]
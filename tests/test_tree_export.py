@@ -0,0 +1,81 @@
+"""Exported forests must score like the pickled LightGBM model they came from."""
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_transactions
+from features import FeatureEncoder
+from tree_export import export_forest, load_forest, publish_forest
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "lightgbm_model.pkl")
+
+
+@pytest.fixture(scope="module")
+def model_and_matrix():
+    with open(MODEL_PATH, "rb") as file:
+        model, feature_names = pickle.load(file)
+    data = make_transactions(5_000)
+    data.insert(0, "step", np.random.default_rng(0).integers(1, 744, len(data)))
+    return model, feature_names, FeatureEncoder(feature_names).encode_frame(data)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_compiled_forest_matches_lightgbm(tmp_path, model_and_matrix, mmap):
+    model, feature_names, matrix = model_and_matrix
+    forest = load_forest(export_forest(model, feature_names, str(tmp_path / "model.forest")), mmap=mmap)
+
+    expected = model.predict_proba(matrix)[:, 1]
+    np.testing.assert_allclose(forest.predict_proba(matrix)[:, 1], expected, rtol=0, atol=1e-12)
+    # ✅ Single rows take the plain-Python walk
+    np.testing.assert_allclose(forest.predict_proba(matrix[:1])[:, 1], expected[:1], rtol=0, atol=1e-12)
+
+
+def test_contributions_add_up_to_the_raw_score(tmp_path, model_and_matrix):
+    model, feature_names, matrix = model_and_matrix
+    forest = load_forest(export_forest(model, feature_names, str(tmp_path / "model.forest")))
+
+    contrib = forest.predict_contrib(matrix[:500])
+    assert contrib.shape == (500, len(feature_names) + 1)
+    np.testing.assert_allclose(contrib.sum(axis=1), model.predict_proba(matrix[:500], raw_score=True), atol=1e-9)
+
+
+def test_reexport_leaves_a_loaded_forest_intact(tmp_path, model_and_matrix):
+    model, feature_names, matrix = model_and_matrix
+    out_dir = str(tmp_path / "model.forest")
+    live = load_forest(export_forest(model, feature_names, out_dir), mmap=True)
+    before = live.predict_proba(matrix)[:, 1]
+
+    from lightgbm import LGBMClassifier
+
+    other = LGBMClassifier(n_estimators=5, verbose=-1).fit(matrix, np.arange(len(matrix)) % 2)
+    export_forest(other, feature_names, out_dir)
+    assert np.array_equal(live.predict_proba(matrix)[:, 1], before)
+
+
+def test_binned_forest_matches_lightgbm(tmp_path, model_and_matrix):
+    model, feature_names, matrix = model_and_matrix
+    forest = load_forest(export_forest(model, feature_names, str(tmp_path / "model.forest"), binned=True))
+
+    expected = model.predict_proba(matrix)[:, 1]
+    np.testing.assert_allclose(forest.predict_proba(matrix)[:, 1], expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(forest.predict_proba(matrix[:1])[:, 1], expected[:1], rtol=0, atol=1e-12)
+    # ✅ Pre-binned rows (what the compact variant can be fed directly) give the same raw score
+    np.testing.assert_allclose(forest.predict_binned(forest.bin(matrix)), forest.predict_raw(matrix), atol=1e-12)
+
+
+def test_publish_forest_leaves_a_served_forest_intact(tmp_path, model_and_matrix):
+    model, feature_names, matrix = model_and_matrix
+    served = str(tmp_path / "served.forest")
+    publish_forest(export_forest(model, feature_names, str(tmp_path / "v1.forest"), binned=True), served)
+    live = load_forest(served, mmap=True)
+    before = live.predict_proba(matrix)[:, 1]
+
+    from lightgbm import LGBMClassifier
+
+    other = LGBMClassifier(n_estimators=5, max_depth=3, verbose=-1).fit(matrix, np.arange(len(matrix)) % 2)
+    publish_forest(export_forest(other, feature_names, str(tmp_path / "v2.forest"), binned=True), served)
+    assert np.array_equal(live.predict_proba(matrix)[:, 1], before)
+    np.testing.assert_allclose(load_forest(served).predict_proba(matrix)[:, 1], other.predict_proba(matrix)[:, 1],
+                               atol=1e-12)
@@ -0,0 +1,360 @@
+"""Train the fraud model from fraud.csv outside the notebook.
+
+    python train.py fraud.csv --candidates lightgbm random_forest xgboost --folds 5
+    python train.py fraud.csv --folds 1 --compact   # also build the low-latency variant
+
+Loads the CSV with compact dtypes, caches the encoded training matrix on disk,
+cross-validates the candidates in parallel, then trains the selected one and
+writes a versioned artifact plus lightgbm_model.pkl for the Streamlit apps.
+
+With --compact a second model with shallow trees, early-stopped on validation
+AUC, is exported as a binned forest (lightgbm_model_compact.forest) and
+compared with the full model: fraud recall, throughput and size on the test
+split. Both load through model_registry.read_artifact.
+
+Every published model gets a drift reference profile next to it
+(``<model>.drift.json``, see drift.py) built from the test split.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import resource
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from drift import frame_from_matrix, profile_model, reference_path_for, write_profile
+from explain import save_reference_sample
+from features import TRANSACTION_TYPES, FeatureEncoder
+
+log = logging.getLogger("train")
+
+# ✅ Same columns, in the same order, as pd.get_dummies(x, drop_first=True) in the notebook
+TRAINING_FEATURES = ["step", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest",
+                     "type_CASH_OUT", "type_DEBIT", "type_PAYMENT", "type_TRANSFER"]
+
+CSV_DTYPES = {
+    "step": "int16",
+    "type": pd.CategoricalDtype(TRANSACTION_TYPES),
+    "amount": "float32",
+    "oldbalanceOrg": "float32",
+    "newbalanceOrig": "float32",
+    "oldbalanceDest": "float32",
+    "newbalanceDest": "float32",
+    "isFraud": "int8",
+}
+
+ARTIFACT_DIR = "artifacts"
+CACHE_DIR = ".train_cache"
+
+# ⚡ Low-latency variant: depth-4 trees, as many as validation AUC keeps improving
+COMPACT_PARAMS = {"n_estimators": 300, "learning_rate": 0.1, "max_depth": 4, "num_leaves": 15,
+                  "min_child_samples": 50}
+COMPACT_PATIENCE = 20  # rounds without a better validation AUC before training stops
+COMPACT_VALID_SIZE = 0.1  # share of the training split held out for early stopping
+
+
+def make_candidate(name, n_jobs=1):
+    """The candidate models from the notebook, with the same hyperparameters."""
+    if name == "lightgbm":
+        from lightgbm import LGBMClassifier
+        return LGBMClassifier(n_estimators=30, learning_rate=0.05, max_depth=10, random_state=42, n_jobs=n_jobs,
+                              verbose=-1)
+    if name == "random_forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=10, max_depth=5, random_state=42, n_jobs=n_jobs)
+    if name == "xgboost":
+        from xgboost import XGBClassifier
+        return XGBClassifier(n_estimators=10, max_depth=3, learning_rate=0.05, eval_metric="logloss", reg_lambda=1,
+                             n_jobs=n_jobs)
+    raise ValueError(f"unknown candidate: {name!r}")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Log wall-clock time and peak RSS of a pipeline stage."""
+    start = time.perf_counter()
+    log.info("▶ %s", name)
+    yield
+    log.info("✅ %s: %.1fs, peak RSS %.0f MB", name, time.perf_counter() - start, peak_rss_mb())
+
+
+def load_transactions(csv_path):
+    """Read only the training columns of fraud.csv with compact dtypes."""
+    return pd.read_csv(csv_path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES)
+
+
+def _cache_key(csv_path):
+    info = os.stat(csv_path)
+    key = f"{os.path.abspath(csv_path)}|{info.st_size}|{info.st_mtime_ns}|{','.join(TRAINING_FEATURES)}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def load_training_matrix(csv_path, cache_dir=CACHE_DIR):
+    """Return ``(x, y, cache_prefix)``; the encoded matrix is cached as .npy next to the CSV run.
+
+    Cached arrays are memory-mapped, so CV workers share them through the page
+    cache instead of pickling copies.
+    """
+    prefix = os.path.join(cache_dir, _cache_key(csv_path))
+    if not os.path.exists(prefix + ".y.npy"):
+        with stage("load + encode CSV"):
+            df = load_transactions(csv_path)
+            encoder = FeatureEncoder(TRAINING_FEATURES, dtype=np.float32)
+            x = encoder.encode_frame(df)
+            y = df["isFraud"].to_numpy()
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(prefix + ".x.npy", x)
+            np.save(prefix + ".y.npy", y)
+        del df, x, y
+    else:
+        log.info("✅ Using cached training matrix %s", prefix)
+    return np.load(prefix + ".x.npy", mmap_mode="r"), np.load(prefix + ".y.npy", mmap_mode="r"), prefix
+
+
+def _resample(x, y, smote):
+    if not smote:
+        return x, y
+    from imblearn.over_sampling import SMOTE
+    return SMOTE(random_state=42).fit_resample(x, y)
+
+
+def evaluate(model, x, y):
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
+
+    prob = model.predict_proba(x)[:, 1]
+    pred = (prob > 0.5).astype(np.int8)
+    return {
+        "accuracy": float(accuracy_score(y, pred)),
+        "precision": float(precision_score(y, pred, zero_division=0)),
+        "recall": float(recall_score(y, pred)),
+        "auc": float(roc_auc_score(y, prob)),
+    }
+
+
+def _run_fold(candidate, fold, folds, prefix, smote):
+    """Train and score one (candidate, fold) pair; runs in a worker process."""
+    from sklearn.model_selection import StratifiedKFold
+
+    x = np.load(prefix + ".x.npy", mmap_mode="r")
+    y = np.load(prefix + ".y.npy", mmap_mode="r")
+    splits = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(np.zeros(len(y)), y)
+    train_idx, valid_idx = next(s for i, s in enumerate(splits) if i == fold)
+
+    # ✅ SMOTE only on the training part of the fold, never on validation rows
+    x_train, y_train = _resample(x[train_idx], y[train_idx], smote)
+    start = time.perf_counter()
+    model = make_candidate(candidate).fit(x_train, y_train)
+    metrics = evaluate(model, x[valid_idx], y[valid_idx])
+    metrics["fit_seconds"] = time.perf_counter() - start
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return candidate, fold, metrics
+
+
+def cross_validate(candidates, folds, prefix, smote, workers):
+    """Run every (candidate, fold) pair in a process pool; returns mean metrics per candidate."""
+    results = {name: [] for name in candidates}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(_run_fold, name, fold, folds, prefix, smote) for name in candidates for fold in range(folds)]
+        for job in jobs:
+            name, fold, metrics = job.result()
+            log.info("   %s fold %d: %s", name, fold, {k: round(v, 4) for k, v in metrics.items()})
+            results[name].append(metrics)
+    return {name: {k: float(np.mean([m[k] for m in runs])) for k in runs[0]} for name, runs in results.items()}
+
+
+def write_artifact(model, metadata, artifact_dir=ARTIFACT_DIR, publish_path="lightgbm_model.pkl"):
+    """Save ``(model, feature_names)`` as a versioned artifact and publish it where the apps load it.
+
+    Metadata (version, metrics, data checksum) goes to a ``.json`` file next to
+    each ``.pkl``.
+    """
+    import pickle
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    versioned = os.path.join(artifact_dir, f"{metadata['candidate']}-{metadata['version']}.pkl")
+    with open(versioned, "wb") as file:
+        pickle.dump((model, list(TRAINING_FEATURES)), file)
+    with open(os.path.splitext(versioned)[0] + ".json", "w") as file:
+        json.dump(metadata, file, indent=2)
+
+    if publish_path:
+        # ✅ Write-then-rename so a running app never unpickles a half-written file
+        tmp_path = publish_path + ".tmp"
+        shutil.copyfile(versioned, tmp_path)
+        shutil.copyfile(os.path.splitext(versioned)[0] + ".json", os.path.splitext(publish_path)[0] + ".json")
+        os.replace(tmp_path, publish_path)
+    return versioned
+
+
+def fit_compact(x_train, y_train, x_valid, y_valid, n_jobs=-1):
+    """Shallow LightGBM stopped once validation AUC has not improved for COMPACT_PATIENCE rounds."""
+    from lightgbm import LGBMClassifier, early_stopping
+
+    model = LGBMClassifier(**COMPACT_PARAMS, metric="auc", random_state=42, n_jobs=n_jobs, verbose=-1)
+    return model.fit(x_train, y_train, eval_set=[(x_valid, y_valid)],
+                     callbacks=[early_stopping(COMPACT_PATIENCE, verbose=False)])
+
+
+def artifact_size(path):
+    """Bytes on disk of a .pkl artifact or an exported forest folder."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def measure_variant(model, x, y, single_rows=1000):
+    """Test metrics plus batch throughput and single-row latency of ``predict_proba``."""
+    metrics = evaluate(model, x, y)
+    start = time.perf_counter()
+    model.predict_proba(x)
+    metrics["rows_per_second"] = len(x) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(min(single_rows, len(x))):
+        model.predict_proba(x[i:i + 1])
+    metrics["single_row_us"] = (time.perf_counter() - start) / min(single_rows, len(x)) * 1e6
+    return metrics
+
+
+def build_compact(x, y, train_idx, test_idx, full_model, smote, version, workers=None, artifact_dir=ARTIFACT_DIR,
+                  publish_path="lightgbm_model_compact.forest"):
+    """Train, export (binned) and compare the compact variant; returns the report per variant."""
+    import pickle
+
+    from sklearn.model_selection import train_test_split
+
+    from model_registry import read_artifact
+    from tree_export import export_forest, publish_forest
+
+    # ✅ Early stopping watches rows the model never trains on, and the test split stays untouched
+    fit_idx, valid_idx = train_test_split(train_idx, test_size=COMPACT_VALID_SIZE, random_state=42,
+                                          stratify=y[train_idx])
+    x_fit, y_fit = _resample(x[np.sort(fit_idx)], y[np.sort(fit_idx)], smote)
+    model = fit_compact(x_fit, y_fit, x[np.sort(valid_idx)], y[np.sort(valid_idx)], n_jobs=workers or -1)
+    log.info("   compact: %d trees (best validation AUC %.4f)", model.best_iteration_,
+             model.best_score_["valid_0"]["auc"])
+
+    versioned = os.path.join(artifact_dir, f"lightgbm_compact-{version}.forest")
+    export_forest(model, TRAINING_FEATURES, versioned, binned=True)
+    compact, _ = read_artifact(versioned)  # ✅ Measured exactly as the model registry will serve it
+
+    x_test, y_test = x[np.sort(test_idx)], y[np.sort(test_idx)]
+    report = {
+        "full": {**measure_variant(full_model, x_test, y_test),
+                 "size_bytes": len(pickle.dumps((full_model, list(TRAINING_FEATURES))))},
+        "compact": {**measure_variant(compact, x_test, y_test), "size_bytes": artifact_size(versioned),
+                    "num_trees": int(model.best_iteration_), "params": COMPACT_PARAMS},
+    }
+    log.info("   %-8s %8s %9s %8s %12s %11s %10s", "variant", "recall", "precision", "auc", "rows/s", "1-row us",
+             "size KB")
+    for name, m in report.items():
+        log.info(f"   {name:<8} {m['recall']:>8.4f} {m['precision']:>9.4f} {m['auc']:>8.4f} "
+                 f"{m['rows_per_second']:>12,.0f} {m['single_row_us']:>11.1f} {m['size_bytes'] / 1024:>10.1f}")
+
+    metadata = {"version": version, "candidate": "lightgbm_compact", "feature_names": TRAINING_FEATURES,
+                "smote": smote, "test_metrics": report["compact"], "variants": report}
+    with open(versioned[:-len(".forest")] + ".json", "w") as file:
+        json.dump(metadata, file, indent=2)
+    profile = profile_model(compact, frame_from_matrix(x_test, TRAINING_FEATURES), TRAINING_FEATURES, version)
+    write_profile(profile, reference_path_for(versioned))
+    if publish_path:
+        # ✅ Files are renamed into place, meta.json last: a serving process keeps its mapped arrays intact
+        # and a watching registry never loads a partial folder
+        write_profile(profile, reference_path_for(publish_path))
+        shutil.copyfile(versioned[:-len(".forest")] + ".json", os.path.splitext(publish_path)[0] + ".json")
+        publish_forest(versioned, publish_path)
+        log.info("   published %s", publish_path)
+    return report
+
+
+def train(csv_path, candidates=("lightgbm",), folds=5, select="lightgbm", smote=True, workers=None,
+          publish_path="lightgbm_model.pkl", compact=False, compact_path="lightgbm_model_compact.forest"):
+    """Full pipeline: load/cache, parallel CV, final fit on an 80/20 split, artifact.
+
+    With ``compact`` the low-latency variant is built from the same split and
+    its trade-off report is stored in both artifacts' metadata.
+    """
+    from sklearn.model_selection import train_test_split
+
+    x, y, prefix = load_training_matrix(csv_path)
+
+    cv_metrics = {}
+    if folds > 1:
+        with stage(f"cross-validate {', '.join(candidates)} ({folds} folds)"):
+            cv_metrics = cross_validate(candidates, folds, prefix, smote, workers)
+        for name, metrics in cv_metrics.items():
+            log.info("   %s mean: %s", name, {k: round(v, 4) for k, v in metrics.items()})
+    if select == "best":
+        select = max(cv_metrics, key=lambda name: cv_metrics[name]["auc"])
+
+    with stage(f"final fit: {select}"):
+        # ✅ Same split as train_lightgbm_model in the notebook
+        train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+        x_train, y_train = _resample(x[np.sort(train_idx)], y[np.sort(train_idx)], smote)
+        model = make_candidate(select, n_jobs=workers or -1).fit(x_train, y_train)
+        test_metrics = evaluate(model, x[np.sort(test_idx)], y[np.sort(test_idx)])
+        log.info("   test: %s", {k: round(v, 4) for k, v in test_metrics.items()})
+
+    version = time.strftime("%Y%m%d-%H%M%S")
+    variants = {}
+    if compact:
+        with stage("compact variant"):
+            variants = build_compact(x, y, np.sort(train_idx), test_idx, model, smote, version, workers,
+                                     publish_path=compact_path)
+
+    with stage("write artifact"):
+        metadata = {
+            "version": version,
+            "candidate": select,
+            "feature_names": TRAINING_FEATURES,
+            "data_key": os.path.basename(prefix),
+            "smote": smote,
+            "cv_metrics": cv_metrics,
+            "test_metrics": test_metrics,
+        }
+        if variants:
+            metadata["variants"] = variants
+        # ✅ The drift profile goes first: a registry reloading the new model must not pick up the old profile
+        profile = profile_model(model, frame_from_matrix(x[np.sort(test_idx)], TRAINING_FEATURES), TRAINING_FEATURES,
+                                metadata["version"])
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        write_profile(profile, reference_path_for(os.path.join(ARTIFACT_DIR, f"{select}-{metadata['version']}.pkl")))
+        if publish_path:
+            write_profile(profile, reference_path_for(publish_path))
+        path = write_artifact(model, metadata, publish_path=publish_path)
+        save_reference_sample(x, TRAINING_FEATURES)  # ✅ Background data for the LIME explainer
+        log.info("   wrote %s", path)
+    return model, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="fraud.csv from the online payments fraud dataset")
+    parser.add_argument("--candidates", nargs="+", default=["lightgbm", "random_forest", "xgboost"])
+    parser.add_argument("--folds", type=int, default=5, help="1 skips cross-validation")
+    parser.add_argument("--select", default="lightgbm", help="candidate to ship, or 'best' (highest CV AUC)")
+    parser.add_argument("--smote", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--publish", default="lightgbm_model.pkl", help="where the apps load the model from")
+    parser.add_argument("--compact", action="store_true", help="also build the shallow, binned low-latency variant")
+    parser.add_argument("--publish-compact", default="lightgbm_model_compact.forest")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    with stage("training pipeline"):
+        train(args.csv, args.candidates, args.folds, args.select, args.smote, args.workers, args.publish,
+              args.compact, args.publish_compact)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""Flatten the LightGBM trees into NumPy arrays and evaluate them without lightgbm.
+
+    python tree_export.py lightgbm_model.pkl lightgbm_model.forest
+    python tree_export.py lightgbm_model.pkl lightgbm_model.forest --binned
+
+The output folder holds one .npy file per array plus meta.json; load_forest()
+memory-maps the arrays, so a worker needs only numpy to score. A binned export
+also stores every feature's split thresholds: inputs are cut into bins once,
+and the trees compare uint8/uint16 bin indices instead of floats.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+from bisect import bisect_left
+
+import numpy as np
+
+ZERO_THRESHOLD = 1e-35  # LightGBM's kZeroThreshold
+MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+ARRAYS = ["split_feature", "threshold", "left_child", "right_child", "default_left", "missing_type", "leaf_value",
+          "roots"]
+BIN_ARRAYS = ["bin_edges", "bin_offsets"]
+CONTRIB_ARRAYS = ["node_value"]  # optional: forests exported before it existed can score but not explain
+
+
+def _flatten(booster):
+    """Walk ``booster.dump_model()`` into flat node arrays.
+
+    Leaves are stored as nodes too, with both children pointing at themselves
+    and an infinite threshold, so every tree can be walked a fixed number of
+    steps without masks. ``node_value`` is the training-count weighted mean
+    of the leaves below each node, used for feature contributions.
+    """
+    dump = booster.dump_model()
+    nodes = {name: [] for name in ARRAYS + CONTRIB_ARRAYS if name != "roots"}
+    counts = []
+    roots = []
+    max_depth = 0
+
+    def add(node, depth):
+        nonlocal max_depth
+        index = len(nodes["split_feature"])
+        for values in nodes.values():
+            values.append(0)
+        counts.append(0)
+
+        if "leaf_value" in node or "split_feature" not in node:
+            max_depth = max(max_depth, depth)
+            nodes["split_feature"][index] = 0
+            nodes["threshold"][index] = np.inf
+            nodes["left_child"][index] = nodes["right_child"][index] = index
+            nodes["leaf_value"][index] = nodes["node_value"][index] = node["leaf_value"]
+            counts[index] = node.get("leaf_count", 1)
+            return index
+
+        if node.get("decision_type", "<=") != "<=":
+            raise ValueError("categorical splits are not supported")
+        nodes["split_feature"][index] = node["split_feature"]
+        nodes["threshold"][index] = node["threshold"]
+        nodes["default_left"][index] = node["default_left"]
+        nodes["missing_type"][index] = MISSING_TYPES[node.get("missing_type", "None")]
+        left = nodes["left_child"][index] = add(node["left_child"], depth + 1)
+        right = nodes["right_child"][index] = add(node["right_child"], depth + 1)
+        counts[index] = counts[left] + counts[right]
+        nodes["node_value"][index] = (nodes["node_value"][left] * counts[left] +
+                                      nodes["node_value"][right] * counts[right]) / max(counts[index], 1)
+        return index
+
+    for tree in dump["tree_info"]:
+        roots.append(add(tree["tree_structure"], 0))
+
+    arrays = {
+        "split_feature": np.array(nodes["split_feature"], dtype=np.int32),
+        "threshold": np.array(nodes["threshold"], dtype=np.float64),
+        "left_child": np.array(nodes["left_child"], dtype=np.int32),
+        "right_child": np.array(nodes["right_child"], dtype=np.int32),
+        "default_left": np.array(nodes["default_left"], dtype=bool),
+        "missing_type": np.array(nodes["missing_type"], dtype=np.int8),
+        "leaf_value": np.array(nodes["leaf_value"], dtype=np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+        "node_value": np.array(nodes["node_value"], dtype=np.float64),
+    }
+
+    objective = dump.get("objective", "binary sigmoid:1").split()
+    if objective[0] != "binary":
+        raise ValueError(f"only binary models are supported, got {objective[0]!r}")
+    sigmoid = next((float(part.split(":")[1]) for part in objective[1:] if part.startswith("sigmoid:")), 1.0)
+    meta = {"max_depth": max_depth, "sigmoid": sigmoid, "average_output": bool(dump.get("average_output", False)),
+            "num_trees": len(roots)}
+    return arrays, meta
+
+
+def _bin_thresholds(arrays, meta, n_features):
+    """Replace node thresholds by bin indices over each feature's sorted split thresholds.
+
+    With ``bin = searchsorted(edges, value, side="left")`` (the number of
+    edges below the value), ``value <= edges[k]`` holds exactly when
+    ``bin <= k``, so the trees take the same path on the bins.
+    """
+    internal = arrays["left_child"] != np.arange(len(arrays["left_child"]))
+    if np.any(arrays["missing_type"][internal] != MISSING_TYPES["None"]):
+        raise ValueError("binning needs a model trained without missing values")
+
+    edges = [np.unique(arrays["threshold"][internal & (arrays["split_feature"] == f)]) for f in range(n_features)]
+    widest = max(len(e) for e in edges)
+    bin_dtype = np.uint8 if widest < np.iinfo(np.uint8).max else np.uint16
+    if widest >= np.iinfo(np.uint16).max:
+        raise ValueError(f"{widest} thresholds on one feature do not fit in uint16 bins")
+
+    # ✅ Leaves get the largest bin value, so every comparison on them is true (they loop onto themselves anyway)
+    threshold = np.full(len(arrays["threshold"]), np.iinfo(bin_dtype).max, dtype=bin_dtype)
+    for f, feature_edges in enumerate(edges):
+        nodes = internal & (arrays["split_feature"] == f)
+        threshold[nodes] = np.searchsorted(feature_edges, arrays["threshold"][nodes])
+    arrays["threshold"] = threshold
+    arrays["split_feature"] = arrays["split_feature"].astype(np.uint8 if n_features <= 256 else np.int32)
+    arrays["bin_edges"] = np.concatenate(edges).astype(np.float64)
+    arrays["bin_offsets"] = np.cumsum([0] + [len(e) for e in edges]).astype(np.int32)
+    meta["binned"] = True
+    meta["bin_dtype"] = np.dtype(bin_dtype).name
+
+
+def export_forest(model, feature_names, out_dir, binned=False):
+    """Write the trees of an LGBMClassifier (or Booster) to ``out_dir``, optionally with binned thresholds."""
+    booster = getattr(model, "booster_", model)
+    arrays, meta = _flatten(booster)
+    meta["feature_names"] = list(feature_names)
+    if binned:
+        _bin_thresholds(arrays, meta, len(feature_names))
+
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_paths = {}
+    for name, values in arrays.items():
+        tmp_paths[name + ".npy"] = tmp_path = os.path.join(out_dir, name + ".npy.tmp")
+        with open(tmp_path, "wb") as file:
+            np.save(file, values)
+    tmp_paths["meta.json"] = tmp_path = os.path.join(out_dir, "meta.json.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(meta, file, indent=2)
+    _replace_files(tmp_paths, out_dir)
+    return out_dir
+
+
+def publish_forest(src_dir, out_dir):
+    """Copy a finished export (e.g. a versioned artifact) over the folder the apps serve."""
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_paths = {}
+    for name in os.listdir(src_dir):
+        tmp_paths[name] = tmp_path = os.path.join(out_dir, name + ".tmp")
+        shutil.copyfile(os.path.join(src_dir, name), tmp_path)
+    _replace_files(tmp_paths, out_dir)
+    return out_dir
+
+
+def _replace_files(tmp_paths, out_dir):
+    """Rename finished ``{file name: temporary path}`` files into ``out_dir``, meta.json last.
+
+    A served forest has its arrays memory-mapped; rewriting them in place would
+    change (or SIGBUS) the live model. A rename gives the new files new inodes
+    and leaves the mapped ones intact. meta.json goes last because the model
+    registry watches it to notice a new export.
+    """
+    for name in sorted(tmp_paths, key=lambda name: name == "meta.json"):
+        os.replace(tmp_paths[name], os.path.join(out_dir, name))
+
+
+class CompiledForest:
+    """Vectorized evaluator over the exported tree arrays.
+
+    Has ``predict_proba`` and ``classes_`` like the sklearn model, so the
+    scoring helpers accept it in place of the LGBMClassifier.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, arrays, meta, chunk_rows=4096):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.node_value = arrays.get("node_value")
+        self.feature_names = meta["feature_names"]
+        self.max_depth = meta["max_depth"]
+        self.sigmoid = meta["sigmoid"]
+        self.average_output = meta["average_output"]
+        self.chunk_rows = chunk_rows
+        self._node_lists = None
+
+    def predict_raw(self, matrix):
+        """Sum of leaf values over all trees (log-odds) for every row."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if len(matrix) == 1:
+            raw = np.array([self._predict_one(matrix[0].tolist())])
+            return raw / len(self.roots) if self.average_output else raw
+
+        raw = np.empty(len(matrix), dtype=np.float64)
+        for start in range(0, len(matrix), self.chunk_rows):
+            raw[start:start + self.chunk_rows] = self._predict_chunk(matrix[start:start + self.chunk_rows])
+        if self.average_output:
+            raw /= len(self.roots)
+        return raw
+
+    def _predict_one(self, values):
+        """Plain-Python walk for a single row; cheaper than NumPy's per-call overhead."""
+        if self._node_lists is None:
+            self._node_lists = tuple(getattr(self, name).tolist() for name in ARRAYS[:-1])
+        split_feature, threshold, left_child, right_child, default_left, missing_type, leaf_value = self._node_lists
+
+        raw = 0.0
+        for node in self.roots.tolist():
+            while left_child[node] != node or right_child[node] != node:
+                value = values[split_feature[node]]
+                kind = missing_type[node]
+                if value != value and kind != 2:  # NaN counts as 0 unless NaN is the missing value
+                    value = 0.0
+                if (kind == 2 and value != value) or (kind == 1 and -ZERO_THRESHOLD <= value <= ZERO_THRESHOLD):
+                    go_left = default_left[node]
+                else:
+                    go_left = value <= threshold[node]
+                node = left_child[node] if go_left else right_child[node]
+            raw += leaf_value[node]
+        return raw
+
+    def _predict_chunk(self, matrix):
+        rows = np.arange(len(matrix))[:, None]
+        node = np.broadcast_to(self.roots, (len(matrix), len(self.roots))).copy()
+
+        # ✅ All trees of all rows move one level per step; leaves loop onto themselves
+        for _ in range(self.max_depth):
+            node = self._next_node(matrix, rows, node)
+
+        return self.leaf_value[node].sum(axis=1)
+
+    def _next_node(self, matrix, rows, node):
+        values = matrix[rows, self.split_feature[node]]
+        missing_type = self.missing_type[node]
+        nan = np.isnan(values)
+        values = np.where(nan & (missing_type != 2), 0.0, values)
+        is_missing = (nan & (missing_type == 2)) | ((missing_type == 1) & (np.abs(values) <= ZERO_THRESHOLD))
+        go_left = np.where(is_missing, self.default_left[node], values <= self.threshold[node])
+        return np.where(go_left, self.left_child[node], self.right_child[node])
+
+    def _prepare(self, matrix):
+        return np.asarray(matrix, dtype=np.float64)
+
+    def predict_contrib(self, matrix):
+        """Per-feature contributions to the log-odds plus a last bias column, like ``pred_contrib=True``.
+
+        Path attribution (Saabas): each split credits its feature with the
+        change in node value from the node to the child the row takes. Rows of
+        a result sum to ``predict_raw``. LightGBM itself uses TreeSHAP, so the
+        numbers differ but the largest contributions normally agree.
+        """
+        if self.node_value is None:
+            raise ValueError("this forest was exported without node values; export it again to explain")
+        values = self._prepare(matrix)
+        n_columns = len(self.feature_names) + 1
+        contrib = np.zeros((len(values), n_columns), dtype=np.float64)
+        contrib[:, -1] = self.node_value[self.roots].sum()
+        for start in range(0, len(values), self.chunk_rows):
+            chunk = values[start:start + self.chunk_rows]
+            rows = np.arange(len(chunk))[:, None]
+            node = np.broadcast_to(self.roots, (len(chunk), len(self.roots))).copy()
+            flat = np.zeros(len(chunk) * n_columns, dtype=np.float64)
+            for _ in range(self.max_depth):
+                child = self._next_node(chunk, rows, node)
+                # ✅ Leaves loop onto themselves, so they add a zero change to feature 0
+                flat += np.bincount((rows * n_columns + self.split_feature[node]).ravel(),
+                                    weights=(self.node_value[child] - self.node_value[node]).ravel(),
+                                    minlength=len(flat))
+                node = child
+            contrib[start:start + len(chunk)] += flat.reshape(len(chunk), n_columns)
+        return contrib / len(self.roots) if self.average_output else contrib
+
+    def predict_proba(self, matrix):
+        prob_fraud = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(matrix)))
+        return np.column_stack([1.0 - prob_fraud, prob_fraud])
+
+
+class BinnedForest(CompiledForest):
+    """CompiledForest whose trees compare bin indices; inputs are binned once per call.
+
+    Exported with ``binned=True`` from a model without missing-value splits, so
+    NaN inputs count as 0 exactly as LightGBM treats them there.
+    """
+
+    def __init__(self, arrays, meta, chunk_rows=4096):
+        super().__init__(arrays, meta, chunk_rows)
+        self.bin_edges = arrays["bin_edges"]
+        self.bin_offsets = arrays["bin_offsets"]
+        self.bin_dtype = np.dtype(meta["bin_dtype"])
+        self._edge_lists = None
+
+    def bin(self, matrix):
+        """Bin index of every value: the number of the feature's split thresholds below it."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        bins = np.empty(matrix.shape, dtype=self.bin_dtype)
+        for feature in range(matrix.shape[1]):
+            values = matrix[:, feature]
+            edges = self.bin_edges[self.bin_offsets[feature]:self.bin_offsets[feature + 1]]
+            bins[:, feature] = np.searchsorted(edges, np.where(np.isnan(values), 0.0, values), side="left")
+        return bins
+
+    def predict_raw(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if len(matrix) > 1:
+            return self.predict_binned(self.bin(matrix))
+        raw = np.array([self._predict_one(self._bin_one(matrix[0].tolist()))])
+        return raw / len(self.roots) if self.average_output else raw
+
+    def predict_binned(self, bins):
+        """Log-odds for rows that are already binned (see ``bin``)."""
+        raw = np.empty(len(bins), dtype=np.float64)
+        for start in range(0, len(bins), self.chunk_rows):
+            raw[start:start + self.chunk_rows] = self._predict_chunk(bins[start:start + self.chunk_rows])
+        return raw / len(self.roots) if self.average_output else raw
+
+    def _bin_one(self, values):
+        if self._edge_lists is None:
+            offsets = self.bin_offsets.tolist()
+            edges = self.bin_edges.tolist()
+            self._edge_lists = [edges[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        return [bisect_left(edges, 0.0 if value != value else value) for edges, value in zip(self._edge_lists, values)]
+
+    def _next_node(self, bins, rows, node):
+        go_left = bins[rows, self.split_feature[node]] <= self.threshold[node]
+        return np.where(go_left, self.left_child[node], self.right_child[node])
+
+    def _prepare(self, matrix):
+        return self.bin(matrix)
+
+
+def load_forest(out_dir, mmap=True):
+    """Load an exported forest (plain or binned); arrays are memory-mapped unless ``mmap`` is False."""
+    with open(os.path.join(out_dir, "meta.json")) as file:
+        meta = json.load(file)
+    names = ARRAYS + BIN_ARRAYS if meta.get("binned") else list(ARRAYS)
+    names += [name for name in CONTRIB_ARRAYS if os.path.exists(os.path.join(out_dir, name + ".npy"))]
+    arrays = {name: np.load(os.path.join(out_dir, name + ".npy"), mmap_mode="r" if mmap else None) for name in names}
+    return BinnedForest(arrays, meta) if meta.get("binned") else CompiledForest(arrays, meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", nargs="?", default="lightgbm_model.pkl")
+    parser.add_argument("out_dir", nargs="?", default="lightgbm_model.forest")
+    parser.add_argument("--binned", action="store_true", help="compare bin indices instead of float thresholds")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file:
+        model, feature_names = pickle.load(file)
+    export_forest(model, feature_names, args.out_dir, binned=args.binned)
+    print(f"✅ Exported {model.booster_.num_trees()} trees to {args.out_dir}" + (" (binned)" if args.binned else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import fcntl
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import TRANSACTION_TYPES
+from instrumentation import timed
+from scoring import predict_fraud_proba
+
+# ✅ Fixed-width column layout of every segment
+SCHEMA = {
+    "type_code": np.int8,  # position in TRANSACTION_TYPES, -1 for unknown
+    "amount": np.float64,
+    "oldbalanceOrg": np.float64,
+    "newbalanceOrig": np.float64,
+    "oldbalanceDest": np.float64,
+    "newbalanceDest": np.float64,
+    "prob_fraud": np.float32,
+    "model_version": np.int16,  # position in the store's version list
+    "timestamp": np.float64,  # seconds since the epoch, when the row was stored
+}
+
+NUMERIC_INPUTS = ["amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+
+
+class TransactionStore:
+    """Append-only columnar store for scored transactions.
+
+    Rows live in fixed-size segments, one memory-mapped ``.npy`` file per
+    column. ``meta.json`` records how many rows of each segment are valid and
+    the model version names, and is rewritten atomically after every append,
+    so readers never see half-written rows.
+
+    Row counts are kept in memory, so a store has a single writer: opening it
+    a second time (e.g. from another app process) raises RuntimeError instead
+    of letting the two overwrite each other's rows.
+    """
+
+    def __init__(self, root="transaction_store", segment_rows=1 << 22):
+        self.root = root
+        self._lock = threading.Lock()
+        self._arrays = {}
+        os.makedirs(root, exist_ok=True)
+
+        # ✅ Held until close() or process exit; the OS drops it when the process dies
+        self._lock_file = open(os.path.join(root, "writer.lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"{root} is already open in another TransactionStore (maybe another process)") from None
+
+        meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                self.meta = json.load(file)
+        else:
+            self.meta = {"segment_rows": segment_rows, "versions": [], "segments": []}
+        self.segment_rows = self.meta["segment_rows"]
+
+    def close(self):
+        """Release the store, so another process (or a new TransactionStore) can open it."""
+        with self._lock:
+            self._arrays.clear()
+            self._lock_file.close()
+
+    def __len__(self):
+        return sum(segment["rows"] for segment in self.meta["segments"])
+
+    @property
+    def versions(self):
+        return list(self.meta["versions"])
+
+    def append(self, data, prob_fraud, model_version, timestamp=None):
+        """Store a scored frame (the six input columns) with its fraud probabilities."""
+        n = len(data)
+        if n == 0:
+            return
+        columns = {name: data[name].to_numpy() for name in NUMERIC_INPUTS}
+        columns["type_code"] = pd.Categorical(data["type"], categories=TRANSACTION_TYPES).codes
+        columns["prob_fraud"] = np.asarray(prob_fraud)
+
+        with self._lock, timed("store.append", rows=n):
+            columns["model_version"] = np.full(n, self._version_code(str(model_version)))
+            columns["timestamp"] = np.full(n, time.time() if timestamp is None else timestamp)
+
+            written = 0
+            while written < n:
+                segment = self._writable_segment()
+                take = min(n - written, self.segment_rows - segment["rows"])
+                arrays = self._segment_arrays(segment["name"])
+                for name, values in columns.items():
+                    arrays[name][segment["rows"]:segment["rows"] + take] = values[written:written + take]
+                segment["rows"] += take
+                written += take
+            self._flush()
+
+    def scan(self, columns=None, start_time=None, end_time=None):
+        """Yield ``(row_offset, {column: array})`` per segment, as zero-copy memory-mapped views.
+
+        ``start_time``/``end_time`` narrow each segment by binary search on the
+        timestamp column (rows are appended in time order).
+        """
+        columns = list(SCHEMA) if columns is None else columns
+        offset = 0
+        for segment in list(self.meta["segments"]):
+            rows = segment["rows"]
+            arrays = self._segment_arrays(segment["name"])
+            lo, hi = 0, rows
+            if start_time is not None or end_time is not None:
+                timestamps = arrays["timestamp"][:rows]
+                if start_time is not None:
+                    lo = int(np.searchsorted(timestamps, start_time, side="left"))
+                if end_time is not None:
+                    hi = int(np.searchsorted(timestamps, end_time, side="right"))
+            if lo < hi:
+                yield offset + lo, {name: arrays[name][lo:hi] for name in columns}
+            offset += rows
+
+    def rescore(self, model, encoder, chunk_rows=1 << 20, **scan_args):
+        """Score stored rows with another model; yields ``(row_offset, prob_fraud)`` per chunk."""
+        for offset, views in self.scan(columns=["type_code"] + NUMERIC_INPUTS, **scan_args):
+            for start in range(0, len(views["type_code"]), chunk_rows):
+                chunk = {name: values[start:start + chunk_rows] for name, values in views.items()}
+                matrix = encoder.encode_columns(chunk, type_codes=chunk["type_code"])
+                yield offset + start, predict_fraud_proba(model, matrix)
+
+    def _version_code(self, version):
+        if version not in self.meta["versions"]:
+            self.meta["versions"].append(version)
+        return self.meta["versions"].index(version)
+
+    def _writable_segment(self):
+        segments = self.meta["segments"]
+        if not segments or segments[-1]["rows"] >= self.segment_rows:
+            segments.append({"name": f"segment-{len(segments):06d}", "rows": 0})
+        return segments[-1]
+
+    def _segment_arrays(self, name):
+        if name not in self._arrays:
+            folder = os.path.join(self.root, name)
+            os.makedirs(folder, exist_ok=True)
+            arrays = {}
+            for column, dtype in SCHEMA.items():
+                path = os.path.join(folder, column + ".npy")
+                if os.path.exists(path):
+                    arrays[column] = np.load(path, mmap_mode="r+")
+                else:
+                    arrays[column] = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(self.segment_rows,))
+            self._arrays[name] = arrays
+        return self._arrays[name]
+
+    def _flush(self):
+        for segment in self.meta["segments"][-2:]:  # ✅ Only the last segments can have new rows
+            for array in self._arrays.get(segment["name"], {}).values():
+                array.flush()
+        tmp_path = os.path.join(self.root, "meta.json.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(self.meta, file)
+        os.replace(tmp_path, os.path.join(self.root, "meta.json"))